@@ -0,0 +1,123 @@
+"""Latency and throughput of the AI tools under concurrent simulated users.
+
+Run from the repository root:
+
+    LLM_RATE_PER_MINUTE=6000 LLM_BURST=50 python -m benchmarks.bench_ai_tools --users 16 --requests 4
+
+Every tool runs against utils.llm.OfflineBackend, so no API key, network
+or quota is needed. Requests go through the same code paths as the pages
+(response cache, shared client, chat history) minus the Streamlit
+rendering. A share of the prompts (--repeat-share) repeats one another
+user already sent, which exercises the response cache and in-flight
+coalescing. The rate limit and worker pool come from the usual
+LLM_RATE_PER_MINUTE, LLM_BURST and LLM_MAX_CONCURRENCY variables. The
+response cache and chat history live in a temporary directory.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules import ai_assistant, ai_writing_assistant, doctorbot
+from utils import db_utils, llm
+from utils.llm_cache import response_cache
+
+SHARED_PROMPTS = [
+    "fever and sore throat for two days",
+    "Quarterly revenue grew 12% while costs stayed flat; the team hired four engineers.",
+    "How do I plan a week of healthy meals on a budget?",
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_tool(label, request, users, per_user, repeat_share, seed):
+    rng = random.Random(seed)
+    jobs = [
+        (f"bench_user_{user}", rng.choice(SHARED_PROMPTS) if rng.random() < repeat_share
+         else f"{label} request {i} from user {user}: {rng.random()}")
+        for user in range(users) for i in range(per_user)
+    ]
+
+    def measure(job):
+        username, text = job
+        started = time.perf_counter()
+        first = None
+        try:
+            for _ in request(username, text):
+                if first is None:
+                    first = time.perf_counter() - started
+        except Exception:
+            return None
+        return first, time.perf_counter() - started
+
+    before = llm.stats()
+    started = time.perf_counter()
+    # One thread per user, each sending its requests one after another.
+    by_user = [jobs[u * per_user:(u + 1) * per_user] for u in range(users)]
+    with ThreadPoolExecutor(max_workers=users) as sessions:
+        results = [r for batch in sessions.map(lambda batch: [measure(j) for j in batch], by_user) for r in batch]
+    elapsed = time.perf_counter() - started
+    after = llm.stats()
+
+    ok = [r for r in results if r is not None]
+    firsts, totals = [r[0] for r in ok], [r[1] for r in ok]
+    print(f"{label:<12} {len(ok) / elapsed:7.2f} req/s  "
+          f"first chunk p50 {statistics.median(firsts) * 1000:6.0f} ms p95 {percentile(firsts, 0.95) * 1000:6.0f} ms  "
+          f"total p50 {statistics.median(totals) * 1000:6.0f} ms p95 {percentile(totals, 0.95) * 1000:6.0f} ms  "
+          f"errors {len(results) - len(ok)}  upstream calls {after['upstream_calls'] - before['upstream_calls']}"
+          f"/{len(results)}  retries {after['retries'] - before['retries']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=4, help="requests per user and tool")
+    parser.add_argument("--first-token", type=float, default=0.4, help="simulated seconds to first chunk")
+    parser.add_argument("--per-chunk", type=float, default=0.03, help="simulated seconds between chunks")
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--midstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--repeat-share", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    llm.set_backend(llm.OfflineBackend(
+        args.first_token, args.per_chunk, args.chunks,
+        args.error_rate, args.midstream_error_rate, seed=args.seed,
+    ))
+    print(f"{args.users} users x {args.requests} requests per tool; rate {llm.RATE_PER_MINUTE:g}/min, "
+          f"burst {llm.BURST}, {llm.MAX_CONCURRENCY} upstream workers")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        response_cache.db_path = os.path.join(tmp, "llm_cache.db")
+        store = ai_assistant.ChatStore(os.path.join(tmp, "chat.db"))
+        assistant = ai_assistant.GeminiAssistant(store)
+        analyzer = doctorbot.GeminiAnalyzer()
+
+        def smarthelper(username, text):
+            parts = []
+            for chunk in assistant.stream_reply(username, text):
+                parts.append(chunk)
+                yield chunk
+            store.add_messages(username, [("user", text), ("model", "".join(parts))])
+
+        tools = {
+            "prowriter": lambda username, text: ai_writing_assistant.stream_response(
+                f"Summarize the following text:\n\n{text}", "bench.prowriter"),
+            "mediconsult": lambda username, text: analyzer.stream_diagnosis(text),
+            "smarthelper": smarthelper,
+        }
+        for seed, (label, request) in enumerate(tools.items(), args.seed):
+            run_tool(label, request, args.users, args.requests, args.repeat_share, seed)
+        db_utils.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Throughput and peak memory of budget bulk import/export.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_budget_bulk --rows 1000000 --format csv
+
+Peak RSS is reported so it can be compared against the file size: both
+import and export stream in chunks, so memory should stay bounded by the
+chunk size rather than the row count.
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import budget_tracker
+from utils import db_utils
+
+GENERATE_CHUNK = 100_000
+
+
+def write_source(path, rows, file_format):
+    rng = np.random.default_rng(0)
+    expense_categories = budget_tracker.CATEGORIES["Expense"]
+    chunks = []
+    for start in range(0, rows, GENERATE_CHUNK):
+        size = min(GENERATE_CHUNK, rows - start)
+        days = rng.integers(0, 3650, size)
+        chunk = pd.DataFrame({
+            "type": "Expense",
+            "amount": rng.uniform(1, 500, size).round(2),
+            "category": rng.choice(expense_categories, size),
+            "entry_date": (pd.Timestamp("2015-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d"),
+        })
+        if file_format == "csv":
+            chunk.to_csv(path, mode="a", header=start == 0, index=False)
+        else:
+            chunks.append(chunk)
+    if file_format == "parquet":
+        pd.concat(chunks).to_parquet(path, index=False)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"entries.{args.format}")
+        write_source(source, args.rows, args.format)
+        size_mb = os.path.getsize(source) / 1024 / 1024
+        budget_tracker.DB_PATH = os.path.join(tmp, "budget.db")
+        budget_tracker.init_db()
+        baseline = peak_rss_mb()
+
+        started = time.perf_counter()
+        imported, rejected = budget_tracker.import_entries("bench", source, args.format)
+        elapsed = time.perf_counter() - started
+        print(f"import  {imported:,} rows ({rejected} rejected) from {size_mb:.1f} MB "
+              f"in {elapsed:.1f}s  {imported / elapsed:,.0f} rows/s  peak RSS {peak_rss_mb():.0f} MB "
+              f"(baseline {baseline:.0f} MB)")
+
+        started = time.perf_counter()
+        with open(os.path.join(tmp, f"export.{args.format}"), "wb") as out:
+            budget_tracker.export_entries("bench", out, args.format)
+        elapsed = time.perf_counter() - started
+        print(f"export  {imported:,} rows in {elapsed:.1f}s  {imported / elapsed:,.0f} rows/s  "
+              f"peak RSS {peak_rss_mb():.0f} MB")
+        db_utils.close_connection(budget_tracker.DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Load time and heap use of the budget history: SQL DataFrame vs Arrow snapshot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_budget_snapshot --rows 1000000
+
+"dataframe" is what get_entries used to do: read every row with
+pd.read_sql_query, then filter with boolean masks. "snapshot" builds the
+memory-mapped Arrow snapshot once, reloads it from the mapped files, then
+refreshes it after a small batch of new entries. Heap is measured as
+DataFrame memory (deep) and Arrow-allocated bytes respectively; mapped
+snapshot pages live in the OS page cache, not on the heap.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.bench_budget_bulk import write_source
+from modules import budget_tracker
+from utils import db_utils
+
+
+def timed(label, func, detail=lambda result: ""):
+    started = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {(time.perf_counter() - started) * 1000:9.1f} ms  {detail(result)}")
+    return result
+
+
+def dataframe_load(username):
+    with db_utils.connection(budget_tracker.DB_PATH) as conn:
+        return pd.read_sql_query("SELECT * FROM budget WHERE username = ?", conn, params=(username,))
+
+
+def dataframe_analytics(df):
+    expenses = df[df["type"] == "Expense"]
+    return (df[df["type"] == "Income"]["amount"].sum(), expenses["amount"].sum(),
+            expenses.groupby("category")["amount"].sum(),
+            df.groupby([df["entry_date"].str[:7], "type"])["amount"].sum())
+
+
+def snapshot_analytics(entries):
+    return (budget_tracker.entry_totals(entries),
+            budget_tracker.entry_category_totals(entries, "Expense"),
+            budget_tracker.entry_monthly_totals(entries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--new-rows", type=int, default=1_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "entries.csv")
+        write_source(source, args.rows, "csv")
+        budget_tracker.DB_PATH = os.path.join(tmp, "budget.db")
+        budget_tracker.init_db()
+        budget_tracker.snapshot_store().root = os.path.join(tmp, "snapshots")
+        budget_tracker.import_entries("bench", source, "csv")
+        build = budget_tracker.get_entries.__wrapped__
+
+        mb = lambda n: f"heap {n / 1024 / 1024:7.1f} MB"
+        df = timed("dataframe load", lambda: dataframe_load("bench"),
+                   lambda df: mb(df.memory_usage(deep=True).sum()))
+        timed("dataframe analytics", lambda: dataframe_analytics(df))
+        del df
+
+        before = pa.total_allocated_bytes()
+        timed("snapshot build (cold)", lambda: build("bench"))
+        entries = timed("snapshot load (mapped)", lambda: budget_tracker.snapshot_store().load("bench")[0],
+                        lambda _: mb(pa.total_allocated_bytes() - before))
+        timed("snapshot analytics", lambda: snapshot_analytics(entries))
+
+        source = os.path.join(tmp, "new.csv")
+        write_source(source, args.new_rows, "csv")
+        budget_tracker.import_entries("bench", source, "csv")
+        entries = timed(f"snapshot refresh (+{args.new_rows:,})", lambda: build("bench"),
+                        lambda table: f"{table.num_rows:,} rows")
+        db_utils.close_connection(budget_tracker.DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
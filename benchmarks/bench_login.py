@@ -0,0 +1,46 @@
+"""Login throughput under concurrent users.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_login --users 16 --logins 64 --rounds 12
+
+Compares checking passwords inline with bcrypt on each user's thread
+against the bounded pool in utils.auth.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from utils import auth
+
+
+def throughput(label, users, logins, check):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as sessions:
+        results = list(sessions.map(lambda _: check(), range(logins)))
+    elapsed = time.perf_counter() - started
+    assert all(results)
+    print(f"{label:<22} {logins / elapsed:10,.1f} logins/s  ({elapsed * 1000 / logins:.2f} ms each)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=auth.BCRYPT_ROUNDS)
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    hashed = auth.hash_password(password, rounds=args.rounds)
+    print(f"{args.users} concurrent users, bcrypt cost {args.rounds}, {auth.BCRYPT_WORKERS} pool workers")
+
+    throughput("inline bcrypt", args.users, args.logins,
+               lambda: bcrypt.checkpw(password.encode(), hashed.encode()))
+    throughput("bcrypt pool", args.users, args.logins,
+               lambda: auth.verify_password(password, hashed))
+
+
+if __name__ == "__main__":
+    main()
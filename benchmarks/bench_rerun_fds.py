@@ -0,0 +1,57 @@
+"""Open file descriptors across many simulated Streamlit reruns.
+
+Run from the repository root (Linux only, reads /proc/self/fd):
+
+    python -m benchmarks.bench_rerun_fds --reruns 2000
+
+Each tracker page is rerun repeatedly for a logged-in user. Database
+connections are process-level resources, so the descriptor count must
+not grow with the number of reruns; the script exits non-zero if it does.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+PAGES = ["task_manager", "budget_tracker", "habit_tracker", "notes_manager"]
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from modules import {module}
+{module}.run()
+"""
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=2000)
+    args = parser.parse_args()
+
+    root = os.getcwd()
+    leaked = False
+    with tempfile.TemporaryDirectory() as tmp:
+        # Tracker databases live under ./data relative to the working directory.
+        os.chdir(tmp)
+        for module in PAGES:
+            app = AppTest.from_string(SCRIPT.format(root=root, module=module), default_timeout=30)
+            app.session_state["username"] = "bench"
+            app.run()
+            before = open_fds()
+            for _ in range(args.reruns):
+                app.run()
+            after = open_fds()
+            leaked |= after > before
+            print(f"{module:<16} fds before {before:>4}  after {args.reruns} reruns {after:>4}")
+        os.chdir(root)
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == "__main__":
+    main()
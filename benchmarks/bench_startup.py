@@ -0,0 +1,83 @@
+"""Cold start and first-render latency of the SmartKit entry point.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup --repeat 5
+
+Every measurement runs in a fresh interpreter so nothing is already in
+sys.modules. "login page" renders main.py once with AppTest as an
+anonymous visitor; "all tools" imports every tool module up front, which
+is what main.py used to do before the first render. Heavy modules are
+only listed when the app itself pulled them in (Streamlit and AppTest
+already import some of them on their own).
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["google.generativeai", "stripe", "plotly", "pandas", "fpdf", "deep_translator"]
+
+LOGIN_PAGE = """
+import json, os, sys, tempfile, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+baseline = set(sys.modules)
+root = os.getcwd()
+os.chdir(tempfile.mkdtemp())
+app = AppTest.from_file(os.path.join(root, "main.py"), default_timeout=120)
+app.secrets["STRIPE_SECRET_KEY"] = "sk_test"
+app.secrets["STRIPE_PUBLISHABLE_KEY"] = "pk_test"
+app.run()
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "loaded": [m for m in HEAVY if m in sys.modules and m not in baseline]}))
+"""
+
+ALL_TOOLS = """
+import importlib, json, sys, time
+started = time.perf_counter()
+import streamlit
+baseline = set(sys.modules)
+for module in TOOLS.values():
+    importlib.import_module(module)
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "loaded": [m for m in HEAVY if m in sys.modules and m not in baseline]}))
+"""
+
+
+def tool_modules():
+    # main.py runs the app on import, so read its TOOLS registry statically.
+    with open("main.py", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "TOOLS":
+            return ast.literal_eval(node.value)
+    raise LookupError("TOOLS registry not found in main.py")
+
+
+def measure(script):
+    source = f"HEAVY = {HEAVY_MODULES!r}\nTOOLS = {tool_modules()!r}\n{script}"
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    output = subprocess.run(
+        [sys.executable, "-c", source], capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, script in [("login page", LOGIN_PAGE), ("all tools", ALL_TOOLS)]:
+        runs = [measure(script) for _ in range(args.repeat)]
+        seconds = [run["seconds"] for run in runs]
+        print(f"{label:<12} median {statistics.median(seconds) * 1000:7.0f} ms  "
+              f"min {min(seconds) * 1000:7.0f} ms  heavy modules loaded: {', '.join(runs[-1]['loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Translation latency for a MediConsult-sized diagnosis.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_translation --latency 0.15 --per-char 0.0004
+
+Uses the offline stand-in backend with a simulated round trip, so no
+network access is needed. Compares one whole-text request (what
+doctorbot.Translator used to send) against chunked concurrent translation
+with a cold cache, and again with a warm cache.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from utils import translation
+
+DIAGNOSIS = """* Possible diagnosis: a common cold or mild viral infection. Influenza is also possible if fever is high.
+* Suggested remedies: rest, warm fluids and steam inhalation. Gargle with warm salt water for a sore throat.
+* Over-the-counter medicine: paracetamol for fever and aches. Antihistamines may ease a runny nose.
+* Risk level: Low. Most cases clear up within a week.
+* See a doctor if the fever lasts more than three days, or if breathing becomes difficult.
+* Follow-up questions: How long have the symptoms lasted? Is there a fever? Any chronic conditions?
+"""
+
+
+def timed(label, translate, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = translate()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<26} {elapsed * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds per request")
+    parser.add_argument("--per-char", type=float, default=0.0004, help="seconds per character")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = translation.OfflineBackend(args.latency, args.per_char)
+    print(f"{len(DIAGNOSIS)} characters, {translation.TRANSLATE_WORKERS} workers")
+    timed("whole text, uncached", lambda: backend.translate(DIAGNOSIS, "ur"), args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "translations.db")
+        cold = translation.CachedTranslator(backend, translation.TranslationCache(db_path))
+        timed("chunked, cold cache", lambda: cold.translate(DIAGNOSIS, "ur"), 1)
+        timed("chunked, warm cache", lambda: cold.translate(DIAGNOSIS, "ur"), args.repeat)
+        translation.db_utils.close_connection(db_path)
+
+
+if __name__ == "__main__":
+    main()
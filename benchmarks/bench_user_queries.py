@@ -0,0 +1,64 @@
+"""Per-user query latency as the shared tasks table grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_user_queries --sizes 10000 100000 1000000
+
+With the (username, deadline) index the per-user lookup time should stay
+flat while the total row count grows by orders of magnitude.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from modules import task_manager
+from utils import db_utils
+
+ROWS_PER_USER = 50
+
+
+def populate(db_path, total_rows):
+    users = max(1, total_rows // ROWS_PER_USER)
+    rows = (
+        (f"user{i % users}", f"task {i}", "", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", "Low")
+        for i in range(total_rows)
+    )
+    with db_utils.transaction(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO tasks (username, title, description, deadline, priority) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+    return users
+
+
+def time_lookups(db_path, users, samples):
+    started = time.perf_counter()
+    for _ in range(samples):
+        with db_utils.connection(db_path) as conn:
+            conn.execute(
+                "SELECT id, title, description, deadline, priority FROM tasks WHERE username=? ORDER BY deadline",
+                (f"user{random.randrange(users)}",),
+            ).fetchall()
+    return (time.perf_counter() - started) / samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            db_path = os.path.join(tmp, f"tasks_{size}.db")
+            db_utils.migrate(db_path, task_manager.MIGRATIONS)
+            users = populate(db_path, size)
+            per_query = time_lookups(db_path, users, args.samples)
+            print(f"{size:>10,} rows  {per_query * 1e6:8.1f} us/query")
+            db_utils.close_connection(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,31 @@
 import streamlit as st
-import streamlit_authenticator as stauth
-import yaml
-import bcrypt
-import os
+import importlib
 import time
 
-from modules import ai_writing_assistant, task_manager, budget_tracker, habit_tracker, notes_manager, ai_assistant, doctorbot
-import stripe
+from utils import auth, user_store
 
 stripe_secret_key = st.secrets["STRIPE_SECRET_KEY"]
 stripe_publishable_key = st.secrets["STRIPE_PUBLISHABLE_KEY"]
 
-stripe.api_key = stripe_secret_key
+# Sidebar label -> module providing run(). Modules are imported on first
+# selection so the login page doesn't pay for pandas, plotly, Gemini, etc.
+TOOLS = {
+    "Task Manager": "modules.task_manager",
+    "Budget Tracker": "modules.budget_tracker",
+    "Habit Tracker": "modules.habit_tracker",
+    "Notes Manager": "modules.notes_manager",
+    "ProWriter AI  ✨ (Free Trial)": "modules.ai_writing_assistant",
+    "MediConsult pro  🩺 (Free Trial)": "modules.doctorbot",
+    "Smart Helper  🌐 (Free Trial)": "modules.ai_assistant",
+}
+
+def run_tool(label):
+    importlib.import_module(TOOLS[label]).run()
 
 def create_checkout_session():
+    import stripe
+
+    stripe.api_key = stripe_secret_key
     try:
         session = stripe.checkout.Session.create(
             payment_method_types=["card"],
@@ -37,36 +49,12 @@ def create_checkout_session():
         return None
 
 
-USERS_FILE = "users.yaml"
-
-def load_users(file_path=USERS_FILE):
-    if not os.path.exists(file_path):
-        return {"credentials": {"usernames": {}}}
-    with open(file_path, "r") as f:
-        users = yaml.safe_load(f)
-
-  
-    for username, info in users["credentials"]["usernames"].items():
-        if "name" not in info:
-            info["name"] = username  
-
-    return users
-
-
-def save_users(users, file_path=USERS_FILE):
-    with open(file_path, "w") as f:
-        yaml.dump(users, f, default_flow_style=False)
-
-def register_user(username, name, password, file_path=USERS_FILE):
-    users = load_users(file_path)
-    if username in users["credentials"]["usernames"]:
+def register_user(username, name, password):
+    if user_store.get_user(username) is not None:
+        return False, "Username already exists"
+    hashed_pw = auth.hash_password(password)
+    if not user_store.add_user(username, name, hashed_pw):
         return False, "Username already exists"
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    users["credentials"]["usernames"][username] = {
-        "name": name,
-        "password": hashed_pw
-    }
-    save_users(users, file_path)
     return True, "User registered successfully"
 
 st.set_page_config(page_title="SmartKit", layout="centered",page_icon="🧰")
@@ -187,10 +175,9 @@ elif "canceled" in query_params:
 # ---------------------------
 
 def main():
-    users_config = load_users()
+    user_store.init_db()
 
-    authenticator = stauth.Authenticate(
-        users_config["credentials"],
+    authenticator = auth.Authenticator(
         "app_cookie",
         "app_key",
         cookie_expiry_days=1
@@ -223,31 +210,8 @@ def main():
             authenticator.logout("Logout", "sidebar")
             st.sidebar.success(f"Welcome {name} 👋")
 
-            app_choice = st.sidebar.radio("Choose a tool:", [
-                "Task Manager",
-                "Budget Tracker",
-                "Habit Tracker",
-                "Notes Manager",
-                "ProWriter AI  ✨ (Free Trial)",
-                "MediConsult pro  🩺 (Free Trial)",
-                "Smart Helper  🌐 (Free Trial)",
-            ])
-
-
-            if app_choice == "Task Manager":
-                task_manager.run()
-            elif app_choice == "Budget Tracker":
-                budget_tracker.run()
-            elif app_choice == "Habit Tracker":
-                habit_tracker.run()
-            elif app_choice == "ProWriter AI  ✨ (Free Trial)":
-                ai_writing_assistant.run()
-            elif app_choice == "Notes Manager":
-                notes_manager.run()
-            elif app_choice == "Smart Helper  🌐 (Free Trial)":
-                ai_assistant.run()
-            elif app_choice == "MediConsult pro  🩺 (Free Trial)":
-                doctorbot.run()   
+            app_choice = st.sidebar.radio("Choose a tool:", list(TOOLS))
+            run_tool(app_choice)
 
 
         with st.sidebar:
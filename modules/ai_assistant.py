@@ -1,49 +1,191 @@
 import streamlit as st
-import google.generativeai as genai
 import os
+from datetime import datetime
 from dotenv import load_dotenv
+from utils import db_utils, llm
+from utils.cache import ReadCache, cached_method
+
+MODEL_NAME = "models/gemini-1.5-flash"
+# Prompt budget for earlier turns; older turns are folded into a running summary.
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKENS", "2000"))
+DISPLAY_MESSAGES = 50
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_chat_messages_username_id ON chat_messages (username, id)",
+    """
+    CREATE TABLE IF NOT EXISTS chat_summaries (
+        username TEXT PRIMARY KEY,
+        summary TEXT NOT NULL,
+        upto_id INTEGER NOT NULL
+    )
+    """,
+]
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text.
+    return len(text) // 4 + 1
+
+
+class ChatStore:
+    def __init__(self, db_path="data/chat.db"):
+        self.db_path = db_path
+        self.cache = ReadCache()
+        db_utils.migrate(self.db_path, MIGRATIONS)
+
+    def add_messages(self, username, messages):
+        now = datetime.now().isoformat(timespec="seconds")
+        with db_utils.transaction(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO chat_messages (username, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(username, role, content, now) for role, content in messages],
+            )
+        self.cache.invalidate(username)
+
+    @cached_method
+    def recent_messages(self, username, limit=DISPLAY_MESSAGES):
+        with db_utils.connection(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, role, content FROM chat_messages WHERE username = ? ORDER BY id DESC LIMIT ?",
+                (username, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def messages_after(self, username, message_id):
+        with db_utils.connection(self.db_path) as conn:
+            return conn.execute(
+                "SELECT id, role, content FROM chat_messages WHERE username = ? AND id > ? ORDER BY id",
+                (username, message_id),
+            ).fetchall()
+
+    def get_summary(self, username):
+        with db_utils.connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT summary, upto_id FROM chat_summaries WHERE username = ?", (username,)
+            ).fetchone()
+        return row or ("", 0)
+
+    def set_summary(self, username, summary, upto_id):
+        with db_utils.transaction(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_summaries (username, summary, upto_id) VALUES (?, ?, ?)",
+                (username, summary, upto_id),
+            )
+
+    def clear(self, username):
+        with db_utils.transaction(self.db_path) as conn:
+            conn.execute("DELETE FROM chat_messages WHERE username = ?", (username,))
+            conn.execute("DELETE FROM chat_summaries WHERE username = ?", (username,))
+        self.cache.invalidate(username)
+
+
+@st.cache_resource
+def get_store():
+    return ChatStore()
 
 
 class GeminiAssistant:
-    def __init__(self, api_key):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("models/gemini-1.5-flash")
-        self.chat = self.model.start_chat(history=[])
+    def __init__(self, store, model_name=MODEL_NAME, token_budget=HISTORY_TOKEN_BUDGET):
+        self.model_name = model_name
+        self.store = store
+        self.token_budget = token_budget
+
+    def summarize(self, summary, turns):
+        transcript = "\n".join(f"{role}: {content}" for _, role, content in turns)
+        prompt = (
+            "Update this summary of a conversation with the new messages below. "
+            "Keep names, facts and open questions; stay under 150 words.\n\n"
+            f"Summary so far: {summary or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        return llm.generate(prompt, self.model_name)
 
-    def chat_with_ai(self, user_input):
-        try:
-            response = self.chat.send_message(user_input)
-            return response.text
-        except Exception as e:
-            return f"❌ Error: {e}"
+    def build_history(self, username):
+        """Return the running summary plus as many recent turns as fit the token budget."""
+        summary, upto_id = self.store.get_summary(username)
+        turns = self.store.messages_after(username, upto_id)
+        if sum(estimate_tokens(content) for _, _, content in turns) > self.token_budget:
+            # Keep the newest turns within half the budget and fold the rest
+            # into the summary, so the next few messages need no model call.
+            kept, used = [], 0
+            for turn in reversed(turns):
+                used += estimate_tokens(turn[2])
+                if used > self.token_budget // 2:
+                    break
+                kept.append(turn)
+            kept.reverse()
+            folded = turns[:len(turns) - len(kept)]
+            try:
+                summary = self.summarize(summary, folded)
+            except Exception:
+                # Without a summary the folded turns are simply dropped.
+                pass
+            summary = summary[:self.token_budget * 2]
+            self.store.set_summary(username, summary, folded[-1][0])
+            turns = kept
+
+        history = []
+        if summary:
+            history.append({"role": "user", "parts": [f"Summary of our conversation so far: {summary}"]})
+            history.append({"role": "model", "parts": ["Got it."]})
+        history += [{"role": role, "parts": [content]} for _, role, content in turns]
+        return history
+
+    def stream_reply(self, username, user_input):
+        contents = self.build_history(username) + [{"role": "user", "parts": [user_input]}]
+        return llm.timed("smarthelper.chat", llm.stream(contents, self.model_name))
 
 
 class GeminiAssistantApp:
-    def __init__(self, api_key):
-        self.assistant = GeminiAssistant(api_key)
+    def __init__(self, assistant):
+        self.assistant = assistant
+
     def show(self):
         st.title("🧠 Welcome to Your AI Buddy!")
         st.subheader("🤖 Your AI Assistant — Here to help you anytime")
 
+        username = st.session_state.get("username")
+        if not username:
+            st.warning("⚠️ You must be logged in to chat with your AI Buddy.")
+            return
+
         st.write("Feel free to ask me anything or get some helpful tips.")
-        user_input = st.text_input("What's on your mind today?", key="gemini_input")
+        store = self.assistant.store
+        if st.button("🧹 Clear conversation"):
+            store.clear(username)
 
+        for _, role, content in store.recent_messages(username):
+            with st.chat_message("user" if role == "user" else "assistant"):
+                st.markdown(content)
 
+        user_input = st.chat_input("What's on your mind today?")
         if user_input:
-            with st.spinner("Thinking..."):
-                response = self.assistant.chat_with_ai(user_input)
-
-            st.markdown(f"**🧑 You:** {user_input}")
-            st.markdown(f"**🤖 Gemini:** {response}")
+            with st.chat_message("user"):
+                st.markdown(user_input)
+            with st.chat_message("assistant"):
+                try:
+                    response = st.write_stream(self.assistant.stream_reply(username, user_input))
+                except Exception as e:
+                    st.error(f"❌ Error: {e}")
+                    return
+            store.add_messages(username, [("user", user_input), ("model", response)])
 
 
 def run():
     load_dotenv()
     api_key = os.getenv("GEMINI_API_KEY")
 
-    if not api_key:
+    if not api_key and isinstance(llm.current_backend(), llm.GeminiBackend):
         st.error("❌ Gemini API key not found. Please set GEMINI_API_KEY in your .env file.")
         return
 
-    app = GeminiAssistantApp(api_key)
+    app = GeminiAssistantApp(GeminiAssistant(get_store()))
     app.show()
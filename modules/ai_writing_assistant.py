@@ -1,14 +1,25 @@
 import streamlit as st
-import google.generativeai as genai
-import os
+from utils import llm
+from utils.llm_cache import response_cache
 
+MODEL_NAME = 'gemini-1.5-flash'
+
+
+def stream_response(prompt, label):
+    chunks = response_cache.stream_or_generate(
+        MODEL_NAME, prompt, lambda: llm.stream(prompt, MODEL_NAME),
+        backend=llm.current_backend().name,
+    )
+    return llm.timed(label, chunks)
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 class AIWritingAssistant:
     def __init__(self):
         st.title("📝 AI Writing Assistant")
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+
+    def generate(self, prompt, label):
+        """Render the response as it streams in and return the full text."""
+        return st.write_stream(stream_response(prompt, label))
 
     def show(self):
         st.subheader("🤖 AI-Powered Writing Assistant")
@@ -32,9 +43,8 @@ class AIWritingAssistant:
                 st.warning("Please enter some text to summarize.")
                 return
             prompt = f"Summarize the following text:\n\n{text}"
-            response = self.model.generate_content(prompt)
             st.success("Summary:")
-            st.write(response.text)
+            self.generate(prompt, "prowriter.summarize")
 
     def generate_email(self):
         recipient = st.text_input("Recipient Name")
@@ -44,9 +54,8 @@ class AIWritingAssistant:
                 st.warning("Please enter the purpose of the email.")
                 return
             prompt = f"Write a professional email to {recipient} about {purpose}"
-            response = self.model.generate_content(prompt)
             st.success("Email Draft:")
-            st.write(response.text)
+            self.generate(prompt, "prowriter.email")
 
     def suggest_resume_bullets(self):
         job_role = st.text_input("Job Role")
@@ -56,9 +65,8 @@ class AIWritingAssistant:
                 st.warning("Please fill both Job Role and Achievements.")
                 return
             prompt = f"Suggest resume bullet points for a {job_role} with these achievements:\n{achievements}"
-            response = self.model.generate_content(prompt)
             st.success("Suggested Resume Bullets:")
-            st.write(response.text)
+            self.generate(prompt, "prowriter.resume")
 
 def run():
     app = AIWritingAssistant()
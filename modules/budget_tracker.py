@@ -1,51 +1,350 @@
 import streamlit as st
-import sqlite3
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import io
 from datetime import date
-import os
+from functools import lru_cache
+from itertools import repeat
+from utils import charts, db_utils, pagination
+from utils.cache import ReadCache
 
-def init_db():
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    conn = sqlite3.connect("data/budget.db")
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS budget
-        (id INTEGER PRIMARY KEY AUTOINCREMENT,
-         username TEXT,
-         type TEXT,
-         amount REAL,
-         category TEXT,
-         entry_date TEXT)
+DB_PATH = "data/budget.db"
+
+CATEGORIES = {
+    "Income": [
+        "Salary", "Freelance", "Business", "Gifts",
+        "Investments", "Bonus", "Other"
+    ],
+    "Expense": [
+        "Food", "Rent", "Utilities", "Transportation",
+        "Entertainment", "Shopping", "Healthcare",
+        "Education", "Travel", "Other"
+    ],
+}
+
+IMPORT_COLUMNS = ["type", "amount", "category", "entry_date"]
+EXPORT_COLUMNS = ["id", "type", "amount", "category", "entry_date"]
+BULK_CHUNK_SIZE = 50_000
+
+read_cache = ReadCache()
+
+def _rebuild_rollup(conn):
+    conn.execute("DELETE FROM budget_rollup")
+    conn.execute('''
+        INSERT INTO budget_rollup (username, month, type, category, total, entry_count)
+        SELECT username, substr(entry_date, 1, 7), type, category, SUM(amount), COUNT(*)
+        FROM budget
+        GROUP BY username, substr(entry_date, 1, 7), type, category
     ''')
-    conn.commit()
-    conn.close()
+
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS budget
+    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+     username TEXT,
+     type TEXT,
+     amount REAL,
+     category TEXT,
+     entry_date TEXT)
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_budget_username_entry_date ON budget (username, entry_date)",
+    '''
+    CREATE TABLE IF NOT EXISTS budget_rollup
+    (username TEXT,
+     month TEXT,
+     type TEXT,
+     category TEXT,
+     total REAL NOT NULL DEFAULT 0,
+     entry_count INTEGER NOT NULL DEFAULT 0,
+     PRIMARY KEY (username, month, type, category))
+    ''',
+    _rebuild_rollup,
+    # Snapshot refreshes read a user's rows in id order, a chunk at a time.
+    "CREATE INDEX IF NOT EXISTS idx_budget_username_id ON budget (username, id)",
+]
+
+def init_db():
+    db_utils.migrate(DB_PATH, MIGRATIONS)
+
+def _update_rollup(conn, rows):
+    """Add ``(username, month, type, category, total, count)`` deltas to the rollup."""
+    conn.executemany('''
+        INSERT INTO budget_rollup (username, month, type, category, total, entry_count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (username, month, type, category) DO UPDATE SET
+            total = total + excluded.total,
+            entry_count = entry_count + excluded.entry_count
+    ''', rows)
+
+def rebuild_rollup():
+    with db_utils.transaction(DB_PATH) as conn:
+        _rebuild_rollup(conn)
+    read_cache.clear()
 
 def add_entry(username, entry_type, amount, category, entry_date):
-    conn = sqlite3.connect("data/budget.db")
-    c = conn.cursor()
-    c.execute(
-        "INSERT INTO budget (username, type, amount, category, entry_date) VALUES (?, ?, ?, ?, ?)",
-        (username, entry_type, amount, category, entry_date)
-    )
-    conn.commit()
-    conn.close()
+    with db_utils.transaction(DB_PATH) as conn:
+        conn.execute(
+            "INSERT INTO budget (username, type, amount, category, entry_date) VALUES (?, ?, ?, ?, ?)",
+            (username, entry_type, amount, category, entry_date)
+        )
+        _update_rollup(conn, [(username, entry_date[:7], entry_type, category, amount, 1)])
+    read_cache.invalidate(username)
+
+@lru_cache(maxsize=1)
+def snapshot_store():
+    import pyarrow as pa
+    from utils.snapshots import SnapshotStore
+    # Type and category are dictionary-encoded against fixed vocabularies, so
+    # every segment shares one dictionary and grouping works on small ints.
+    # month is YYYYMM.
+    label = pa.dictionary(pa.int8(), pa.string())
+    schema = pa.schema([
+        ("id", pa.int64()), ("type", label), ("amount", pa.float64()),
+        ("category", label), ("entry_date", pa.date32()), ("month", pa.int32()),
+    ])
+    return SnapshotStore("budget", schema)
 
+@lru_cache(maxsize=1)
+def _vocabularies():
+    import pyarrow as pa
+    categories = sorted({category for names in CATEGORIES.values() for category in names})
+    return pa.array(list(CATEGORIES)), pa.array(categories)
+
+def _encode(values, vocabulary):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    indices = pc.index_in(pa.array(values, pa.string()), value_set=vocabulary).cast(pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, vocabulary)
+
+def _snapshot_batches(username, after_id, schema):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    types_vocabulary, category_vocabulary = _vocabularies()
+    while True:
+        # Take the shared connection for one chunk at a time, so other budget
+        # reads are not held up while the snapshot is being written.
+        with db_utils.connection(DB_PATH) as conn:
+            rows = conn.execute(
+                "SELECT id, type, amount, category, entry_date FROM budget "
+                "WHERE username = ? AND id > ? ORDER BY id LIMIT ?",
+                (username, after_id, BULK_CHUNK_SIZE)
+            ).fetchall()
+        if not rows:
+            return
+        ids, types, amounts, categories, dates = zip(*rows)
+        after_id = ids[-1]
+        dates = pa.array(dates, pa.string()).cast(pa.date32())
+        month = pc.add(pc.multiply(pc.year(dates), 100), pc.month(dates)).cast(pa.int32())
+        yield pa.record_batch([
+            pa.array(ids, pa.int64()), _encode(types, types_vocabulary), pa.array(amounts, pa.float64()),
+            _encode(categories, category_vocabulary), dates, month,
+        ], schema=schema)
+
+def _entry_count(username):
+    with db_utils.connection(DB_PATH) as conn:
+        return conn.execute(
+            "SELECT COALESCE(SUM(entry_count), 0) FROM budget_rollup WHERE username = ?", (username,)
+        ).fetchone()[0]
+
+@read_cache.cached
 def get_entries(username):
-    conn = sqlite3.connect("data/budget.db")
-    df = pd.read_sql_query(
-        "SELECT * FROM budget WHERE username = ?", conn, params=(username,)
-    )
-    conn.close()
-    return df
+    """All of the user's entries as an Arrow table backed by a memory-mapped snapshot.
+
+    Only rows added since the snapshot was last written are read from SQLite.
+    If the row count then disagrees with the rollup, entries were deleted in
+    the meantime and the snapshot is rebuilt.
+    """
+    store = snapshot_store()
+    with store.lock(username):
+        table, last_id = store.load(username)
+        written = store.append(username, _snapshot_batches(username, last_id, store.schema))
+        if table.num_rows + written != _entry_count(username):
+            store.clear(username)
+            store.append(username, _snapshot_batches(username, 0, store.schema))
+        elif not written:
+            return table
+        return store.load(username)[0]
+
+def entry_totals(entries):
+    """Total amount per type, vectorized over a ``get_entries`` table."""
+    grouped = entries.group_by("type").aggregate([("amount", "sum")])
+    return dict(zip(grouped["type"].to_pylist(), grouped["amount_sum"].to_pylist()))
+
+def entry_category_totals(entries, entry_type):
+    # Group first and filter the handful of groups, rather than filtering every row.
+    grouped = entries.group_by(["type", "category"]).aggregate([("amount", "sum")]).to_pandas()
+    grouped = grouped[grouped["type"] == entry_type]
+    return pd.DataFrame({"category": grouped["category"].astype(str).to_numpy(),
+                         "amount": grouped["amount_sum"].to_numpy()})
+
+def entry_monthly_totals(entries):
+    """Same shape as ``get_monthly_totals``, computed from the snapshot."""
+    grouped = entries.group_by(["month", "type"]).aggregate([("amount", "sum")]).to_pandas()
+    month = grouped["month"].to_numpy()
+    monthly = pd.DataFrame({"month": [f"{m // 100:04d}-{m % 100:02d}" for m in month],
+                            "series": grouped["type"].astype(str).to_numpy(),
+                            "total": grouped["amount_sum"].to_numpy()})
+    return monthly.sort_values("month", ignore_index=True)
+
+@read_cache.cached
+def get_entries_page(username, entry_type=None, cursor=None, before=False,
+                     page_size=pagination.PAGE_SIZE, descending=True):
+    where, params = "username = ?", (username,)
+    if entry_type is not None:
+        where, params = where + " AND type = ?", params + (entry_type,)
+    with db_utils.connection(DB_PATH) as conn:
+        return pagination.fetch_page(
+            conn, "budget", ["id", "type", "amount", "category", "entry_date"],
+            where, params, "entry_date",
+            cursor=cursor, before=before, page_size=page_size, descending=descending,
+        )
+
+# The dashboard figures are vectorized over the snapshot and cached per data version.
+
+@read_cache.cached
+def get_totals(username):
+    return entry_totals(get_entries(username))
+
+@read_cache.cached
+def get_category_totals(username, entry_type):
+    return entry_category_totals(get_entries(username), entry_type)
+
+@read_cache.cached
+def get_monthly_totals(username):
+    return entry_monthly_totals(get_entries(username))
 
 def delete_entry(entry_id):
-    conn = sqlite3.connect("data/budget.db")
-    c = conn.cursor()
-    c.execute("DELETE FROM budget WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    with db_utils.transaction(DB_PATH) as conn:
+        row = conn.execute(
+            "SELECT username, type, amount, category, entry_date FROM budget WHERE id = ?", (entry_id,)
+        ).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM budget WHERE id = ?", (entry_id,))
+        username, entry_type, amount, category, entry_date = row
+        _update_rollup(conn, [(username, entry_date[:7], entry_type, category, -amount, -1)])
+        conn.execute("DELETE FROM budget_rollup WHERE entry_count <= 0 AND username = ?", (username,))
+    read_cache.invalidate(username)
+
+def _read_chunks(file, file_format, chunk_size):
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(file)
+        missing = [column for column in IMPORT_COLUMNS if column not in parquet.schema_arrow.names]
+        if missing:
+            # pyarrow silently skips unknown columns; fail like read_csv's usecols does.
+            raise ValueError(f"columns expected but not found: {missing}")
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=IMPORT_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file, usecols=IMPORT_COLUMNS, chunksize=chunk_size,
+                               dtype={"type": str, "category": str, "entry_date": str})
+
+def _validate_chunk(chunk):
+    amount = pd.to_numeric(chunk["amount"], errors="coerce")
+    entry_date = pd.to_datetime(chunk["entry_date"], errors="coerce", format="ISO8601")
+    known_category = pd.Series(False, index=chunk.index)
+    for entry_type, categories in CATEGORIES.items():
+        known_category |= (chunk["type"] == entry_type) & chunk["category"].isin(categories)
+    valid = known_category & (amount > 0) & np.isfinite(amount) & entry_date.notna()
+    clean = pd.DataFrame({
+        "type": chunk["type"][valid],
+        "amount": amount[valid].astype(float),
+        "category": chunk["category"][valid],
+        "entry_date": entry_date[valid].dt.strftime("%Y-%m-%d"),
+    })
+    return clean, int((~valid).sum())
+
+def import_entries(username, file, file_format="csv", chunk_size=BULK_CHUNK_SIZE):
+    """Stream a CSV or Parquet file into the budget, one transaction per chunk.
+
+    Rows with an unknown type/category, a non-positive or non-finite
+    amount or an unparseable date are skipped. Returns
+    ``(imported, rejected)``. A file without the IMPORT_COLUMNS raises
+    ValueError.
+    """
+    imported = rejected = 0
+    for chunk in _read_chunks(file, file_format, chunk_size):
+        clean, bad = _validate_chunk(chunk)
+        rejected += bad
+        if clean.empty:
+            continue
+        monthly = (
+            clean.assign(month=clean["entry_date"].str[:7])
+            .groupby(["month", "type", "category"], as_index=False)["amount"]
+            .agg(["sum", "size"])
+        )
+        with db_utils.transaction(DB_PATH) as conn:
+            conn.executemany(
+                "INSERT INTO budget (username, type, amount, category, entry_date) VALUES (?, ?, ?, ?, ?)",
+                zip(repeat(username), clean["type"], clean["amount"].tolist(),
+                    clean["category"], clean["entry_date"])
+            )
+            _update_rollup(conn, [
+                (username, month, entry_type, category, total, count)
+                for month, entry_type, category, total, count in monthly.itertuples(index=False)
+            ])
+        imported += len(clean)
+        read_cache.invalidate(username)
+    return imported, rejected
+
+def _export_chunks(username, chunk_size):
+    cursor = None
+    while True:
+        # Export pages are read once; keep them out of the read cache.
+        page = get_entries_page.__wrapped__(username, cursor=cursor, page_size=chunk_size, descending=False)
+        yield pd.DataFrame.from_records(page.rows, columns=EXPORT_COLUMNS)
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+def export_entries(username, out, file_format="csv", chunk_size=BULK_CHUNK_SIZE):
+    """Write the user's entries to the binary file ``out`` chunk by chunk."""
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        for chunk in _export_chunks(username, chunk_size):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        for i, chunk in enumerate(_export_chunks(username, chunk_size)):
+            out.write(chunk.to_csv(header=i == 0, index=False).encode())
+
+def _export_file(username, file_format):
+    # st.download_button copies the whole download into bytes anyway, and
+    # only accepts bytes-like or BytesIO results from a deferred callable.
+    out = io.BytesIO()
+    export_entries(username, out, file_format)
+    out.seek(0)
+    return out
+
+def display_bulk_tools(username):
+    with st.expander("📂 Bulk Import / Export"):
+        st.caption(f"Files need the columns: {', '.join(IMPORT_COLUMNS)} (dates as YYYY-MM-DD).")
+        uploaded = st.file_uploader("Import entries", type=["csv", "parquet"])
+        if uploaded is not None and st.button("Import"):
+            file_format = "parquet" if uploaded.name.endswith(".parquet") else "csv"
+            try:
+                with st.spinner("Importing entries..."):
+                    imported, rejected = import_entries(username, uploaded, file_format)
+            except ValueError as e:
+                # Missing or renamed columns, or a file that isn't valid CSV/Parquet.
+                st.error(f"❌ Could not import {uploaded.name}: {e}")
+            else:
+                st.success(f"✅ Imported {imported} entries.")
+                if rejected:
+                    st.warning(f"⚠️ Skipped {rejected} invalid rows.")
+
+        file_format = st.radio("Export format", ["csv", "parquet"], horizontal=True)
+        st.download_button(
+            "📥 Download Entries",
+            data=lambda: _export_file(username, file_format),
+            file_name=f"budget_entries.{file_format}",
+        )
 
 def run():
     st.subheader("📊 Budget Tracker")
@@ -75,19 +374,7 @@ def run():
             amount = st.number_input("Amount", min_value=0.0, format="%.2f")
 
         with col3:
-            if entry_type == "Income":
-                categories = [
-                    "Salary", "Freelance", "Business", "Gifts",
-                    "Investments", "Bonus", "Other"
-                ]
-            else:
-                categories = [
-                    "Food", "Rent", "Utilities", "Transportation",
-                    "Entertainment", "Shopping", "Healthcare",
-                    "Education", "Travel", "Other"
-                ]
-
-            category = st.radio("Category", categories)
+            category = st.radio("Category", CATEGORIES[entry_type])
 
         entry_date = st.date_input("Date", value=date.today())
 
@@ -100,13 +387,15 @@ def run():
             else:
                 st.error("Please enter a valid amount.")
 
+    display_bulk_tools(username)
+
     st.markdown("---")
-    df = get_entries(username)
+    totals = get_totals(username)
 
-    if not df.empty:
+    if totals:
         st.subheader("📅 Budget Summary")
-        income = df[df["type"] == "Income"]["amount"].sum()
-        expense = df[df["type"] == "Expense"]["amount"].sum()
+        income = totals.get("Income", 0.0)
+        expense = totals.get("Expense", 0.0)
         balance = income - expense
 
         st.write(f"**Total Income:** {income:.2f} Rupees")
@@ -116,41 +405,69 @@ def run():
         st.markdown("---")
         st.subheader("💸 Expenses by Category")
 
-        expense_df = df[df["type"] == "Expense"]
-        if not expense_df.empty:
-            grouped = expense_df.groupby("category", as_index=False)["amount"].sum()
-            fig = px.pie(grouped, values='amount', names='category', title='Expenses Distribution')
+        version = read_cache.version(username)
+        grouped = get_category_totals(username, "Expense")
+        if not grouped.empty:
+            fig = charts.figure_cache.get_or_build(
+                ("budget_expense_pie", username), version,
+                lambda: charts.category_pie(grouped, "Expenses Distribution"),
+            )
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No expense data to show pie chart.")
 
+        st.markdown("---")
+        st.subheader("📈 Income vs Expense Trend")
+        period = st.radio("Group by", list(charts.PERIODS), horizontal=True, key="budget_trend_period")
+        fig = charts.figure_cache.get_or_build(
+            ("budget_trend", username, period), version,
+            lambda: charts.trend(
+                get_monthly_totals(username), "Income vs Expense", period,
+                colors={"Income": "#2e7d32", "Expense": "#c62828"},
+            ),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
         st.markdown("---")
         st.subheader("🤑 Income Entries")
-        income_df = df[df["type"] == "Income"]
-        if not income_df.empty:
-            for _, row in income_df.iterrows():
-                st.write(f"{row['entry_date']} — {row['category']} — Rupees{row['amount']:.2f}")
+        income_page = pagination.current_page(
+            "budget_income",
+            lambda cursor, before: get_entries_page(username, "Income", cursor, before),
+        )
+        if income_page.rows:
+            for _, _, amount, category, entry_date in income_page.rows:
+                st.write(f"{entry_date} — {category} — Rupees{amount:.2f}")
+            pagination.page_controls("budget_income", income_page)
         else:
             st.info("No income entries yet.")
 
         st.markdown("---")
         st.subheader("💸 Expense Entries")
-        if not expense_df.empty:
-            for _, row in expense_df.iterrows():
-                st.write(f"{row['entry_date']} — {row['category']} — Rupees{row['amount']:.2f}")
+        expense_page = pagination.current_page(
+            "budget_expense",
+            lambda cursor, before: get_entries_page(username, "Expense", cursor, before),
+        )
+        if expense_page.rows:
+            for _, _, amount, category, entry_date in expense_page.rows:
+                st.write(f"{entry_date} — {category} — Rupees{amount:.2f}")
+            pagination.page_controls("budget_expense", expense_page)
         else:
             st.info("No expense entries yet.")
 
         st.markdown("---")
         st.subheader("🧾 All Entries")
-        for _, row in df.iterrows():
+        page = pagination.current_page(
+            "budget_all", lambda cursor, before: get_entries_page(username, None, cursor, before)
+        )
+        for entry_id, entry_type, amount, category, entry_date in page.rows:
             col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
-            col1.write(f"**{row['type']}**")
-            col2.write(f"Rupees{row['amount']:.2f}")
-            col3.write(f"{row['category']}")
-            col4.write(f"{row['entry_date']}")
-            if col5.button("❌", key=row["id"]):
-                delete_entry(row["id"])
+            col1.write(f"**{entry_type}**")
+            col2.write(f"Rupees{amount:.2f}")
+            col3.write(f"{category}")
+            col4.write(f"{entry_date}")
+            if col5.button("❌", key=entry_id):
+                delete_entry(entry_id)
                 st.rerun()
+        pagination.page_controls("budget_all", page)
     else:
         st.info("No entries yet.")
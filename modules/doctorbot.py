@@ -1,17 +1,17 @@
 import streamlit as st
-import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
-from deep_translator import GoogleTranslator
-import google.generativeai as genai
-from fpdf import FPDF
-import base64
+from utils import assets, llm, pdf_generator, translation
+from utils.llm_cache import response_cache
 
-# -------------------- Helper Functions --------------------
-def get_image_base64(image_path):
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+MODEL_NAME = "models/gemini-1.5-flash"
+LANGUAGES = {"English": "en", "Urdu": "ur", "Hindi": "hi"}
+
+# Translations of a finished diagnosis run here while the script thread
+# carries on rendering the English text.
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mediconsult")
 
+# -------------------- Helper Functions --------------------
 def get_risk_score(text):
     if "High" in text:
         return "High", "🔴"
@@ -19,32 +19,41 @@ def get_risk_score(text):
         return "Moderate", "🟠"
     return "Low", "🟢"
 
-# -------------------- Load API Key --------------------
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+@st.cache_resource
+def get_translator():
+    return translation.CachedTranslator()
 
 # -------------------- OOP Classes --------------------
 class Translator:
-    def __init__(self, target_lang):
+    def __init__(self, target_lang, engine=None):
         self.target_lang = target_lang
-        self.lang_map = {"Urdu": "ur", "Hindi": "hi"}
+        self.engine = engine or get_translator()
 
-    def translate(self, text):
+    def to_english(self, text):
         if self.target_lang == "English":
             return text
         try:
-            return GoogleTranslator(source='auto', target=self.lang_map.get(self.target_lang, "en")).translate(text)
+            return self.engine.translate(text, "en")
         except Exception:
             st.error("❌ Translation failed.")
             return text
 
+    def translate_all(self, text):
+        """Start translating ``text`` into every other language; returns {language: future}."""
+        return {
+            lang: _background.submit(self.engine.translate, text, code)
+            for lang, code in LANGUAGES.items() if lang != "English"
+        }
+
 class MedicalAnalyzer:
     def get_diagnosis(self, symptoms):
+        return "".join(self.stream_diagnosis(symptoms))
+
+    def stream_diagnosis(self, symptoms):
         raise NotImplementedError()
 
 class GeminiAnalyzer(MedicalAnalyzer):
-    def get_diagnosis(self, symptoms):
-        model = genai.GenerativeModel("models/gemini-1.5-flash")
+    def stream_diagnosis(self, symptoms):
         prompt = f"""
         A user has reported the following symptoms: {symptoms}.
         1. What could be the possible diagnosis?
@@ -55,8 +64,19 @@ class GeminiAnalyzer(MedicalAnalyzer):
         6. What follow-up questions would help clarify the diagnosis?
         Provide answers in bullet points. Keep it simple and helpful.
         """
-        response = model.generate_content(prompt)
-        return response.text
+        chunks = response_cache.stream_or_generate(
+            MODEL_NAME, prompt, lambda: llm.stream(prompt, MODEL_NAME),
+            backend=llm.current_backend().name,
+        )
+        return llm.timed("mediconsult.diagnosis", chunks)
+
+    def stream_followup(self, question, diagnosis):
+        prompt = f"User asked: '{question}'\nBased on earlier diagnosis: '{diagnosis}'\nRespond clearly and helpfully."
+        chunks = response_cache.stream_or_generate(
+            MODEL_NAME, prompt, lambda: llm.stream(prompt, MODEL_NAME),
+            backend=llm.current_backend().name,
+        )
+        return llm.timed("mediconsult.followup", chunks)
 
 class InputHandler:
     def get_input(self):
@@ -69,18 +89,15 @@ class TextInputHandler(InputHandler):
 
 class PDFExporter:
     def export(self, text):
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        for line in text.split('\n'):
-            pdf.multi_cell(0, 10, line)
-        filename = f"Medical_Report_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-        pdf.output(filename)
-        return filename
+        """Return the report as PDF bytes; rendered in memory and cached by content."""
+        return pdf_generator.render_report("MediConsult Pro - Medical Report", [("Medical Advice", text)])
+
+    def filename(self):
+        return f"Medical_Report_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
 
 # -------------------- Main Function --------------------
 def run():
-    img_base64 = get_image_base64("assets/image1.png")
+    avatar_src = assets.src("sehatbot_avatar")
 
     st.markdown("""<style>
     .main-title {
@@ -122,8 +139,10 @@ def run():
     st.sidebar.markdown("---")
 
     # ---------------- Sidebar ----------------
-    st.sidebar.image("assets/image4.gif", use_container_width=True)
-    lang = st.sidebar.radio("🌐 Choose language", ["English", "Urdu", "Hindi"])
+    st.sidebar.markdown(
+        f"<img src='{assets.src('doctorbot_sidebar')}' style='width: 100%;'>", unsafe_allow_html=True
+    )
+    lang = st.sidebar.radio("🌐 Choose language", list(LANGUAGES))
 
     st.sidebar.markdown(f"""
         <div style='
@@ -135,7 +154,7 @@ def run():
             color: white;
             animation: glow 2s ease-in-out infinite alternate;
         '>
-            <img src='data:image/png;base64,{img_base64}' 
+            <img src='{avatar_src}' 
                  style='width: 75px; height: 75px; border-radius: 50%; margin-bottom: 10px; border: 2px solid white;'>
             <h4 style='margin: 0;'>SehatBot</h4>
             <p style='font-size: 0.9rem;'>Health Advisor</p>
@@ -146,6 +165,8 @@ def run():
 
     # ---------------- Session Init ----------------
     st.session_state.setdefault("symptoms", "")
+    st.session_state.setdefault("diagnosis", "")
+    st.session_state.setdefault("translations", {})
     st.session_state.setdefault("final_result", "")
     st.session_state.setdefault("followup_query", "")
     st.session_state.setdefault("followup_response", "")
@@ -158,25 +179,48 @@ def run():
     # ---------------- Symptom Input ----------------
     symptoms = input_handler.get_input()
 
+    advice = None
     if st.button("🩺 Get Advice"):
         if symptoms.strip():
             st.session_state["symptoms"] = symptoms
             with st.spinner("🩺 Scanning symptoms and preparing advice..."):
-                translated = translator.translate(symptoms)
-                result = analyzer.get_diagnosis(translated)
-                final_result = translator.translate(result)
-                st.session_state["final_result"] = final_result
-                st.session_state["followup_query"] = ""
-                st.session_state["followup_response"] = ""
-                st.markdown("### ✅ Medical Advice:")
-                st.write(final_result)
-                st.markdown("---")
-            risk_level, emoji = get_risk_score(final_result)
-            st.markdown(f"### 🚨 Health Risk Level: {emoji} **{risk_level}**")
-            st.progress({"Low": 0.3, "Moderate": 0.6, "High": 1.0}[risk_level])
+                english_symptoms = translator.to_english(symptoms)
+            st.markdown("### ✅ Medical Advice:")
+            advice = st.empty()
+            with advice.container():
+                diagnosis = st.write_stream(analyzer.stream_diagnosis(english_symptoms))
+            st.session_state["diagnosis"] = diagnosis
+            st.session_state["translations"] = translator.translate_all(diagnosis)
+            st.session_state["followup_query"] = ""
+            st.session_state["followup_response"] = ""
         else:
             st.warning("⚠️ Please enter your symptoms first.")
 
+    # ---------------- Advice ----------------
+    # Shown on every rerun, so switching language picks up the translation
+    # that was prepared in the background.
+    if st.session_state.get("diagnosis"):
+        diagnosis = st.session_state["diagnosis"]
+        final_result = diagnosis
+        if advice is None:
+            st.markdown("### ✅ Medical Advice:")
+            advice = st.empty()
+            advice.write(diagnosis)
+        future = st.session_state["translations"].get(lang)
+        if future is not None:
+            with st.spinner("🌐 Translating..."):
+                try:
+                    final_result = future.result()
+                except Exception:
+                    st.error("❌ Translation failed.")
+            advice.write(final_result)
+        st.session_state["final_result"] = final_result
+        st.markdown("---")
+        # Scored on the English text, where the keywords are.
+        risk_level, emoji = get_risk_score(diagnosis)
+        st.markdown(f"### 🚨 Health Risk Level: {emoji} **{risk_level}**")
+        st.progress({"Low": 0.3, "Moderate": 0.6, "High": 1.0}[risk_level])
+
     # ---------------- Follow-Up Assistant ----------------
     if st.session_state.get("final_result"):
         followup_response = st.session_state.get("followup_response")
@@ -190,11 +234,9 @@ def run():
             if st.button("Submit Follow-Up"):
                 if followup.strip():
                     st.session_state["followup_query"] = followup
-                    with st.spinner("Thinking..."):
-                        response = genai.GenerativeModel("models/gemini-1.5-flash").generate_content(
-                            f"User asked: '{followup}'\nBased on earlier diagnosis: '{st.session_state['final_result']}'\nRespond clearly and helpfully."
-                        )
-                        st.session_state["followup_response"] = response.text
+                    st.session_state["followup_response"] = st.write_stream(
+                        analyzer.stream_followup(followup, st.session_state["final_result"])
+                    )
                     st.rerun()
             if st.session_state.get("followup_response"):
                 st.markdown("### 🤖 Response to Your Question:")
@@ -203,11 +245,9 @@ def run():
     # ---------------- PDF Export ----------------
     if st.session_state.get("final_result"):
         if st.button("📄 Want to Download Medical Report (PDF) ?"):
-            filename = pdf_exporter.export(st.session_state["final_result"])
-            with open(filename, "rb") as file:
-                st.download_button(
-                    label="📥 Click to View PDF",
-                    data=file,
-                    file_name=filename,
-                    mime="application/pdf"
-                )
+            st.download_button(
+                label="📥 Click to View PDF",
+                data=pdf_exporter.export(st.session_state["final_result"]),
+                file_name=pdf_exporter.filename(),
+                mime="application/pdf"
+            )
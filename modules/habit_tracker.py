@@ -1,53 +1,176 @@
 import streamlit as st
-import sqlite3
 from datetime import date
-import pandas as pd
+from utils import db_utils, pagination
+from utils.cache import ReadCache, cached_method
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS habits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        name TEXT,
+        frequency TEXT,
+        start_date TEXT,
+        status TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_habits_user_id_status ON habits (user_id, status)",
+    """
+    CREATE TABLE IF NOT EXISTS habit_checkins (
+        habit_id INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        checkin_date TEXT NOT NULL,
+        PRIMARY KEY (habit_id, period)
+    ) WITHOUT ROWID
+    """,
+    "ALTER TABLE habits ADD COLUMN current_streak INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE habits ADD COLUMN longest_streak INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE habits ADD COLUMN last_period INTEGER",
+    "ALTER TABLE habits ADD COLUMN checkin_count INTEGER NOT NULL DEFAULT 0",
+    # Check-ins are kept run-length encoded: one row per run of consecutive periods.
+    """
+    CREATE TABLE IF NOT EXISTS habit_runs (
+        habit_id INTEGER NOT NULL,
+        first_period INTEGER NOT NULL,
+        last_period INTEGER NOT NULL,
+        PRIMARY KEY (habit_id, first_period)
+    ) WITHOUT ROWID
+    """,
+    """
+    INSERT INTO habit_runs (habit_id, first_period, last_period)
+    SELECT habit_id, MIN(period), MAX(period)
+    FROM (SELECT habit_id, period,
+                 period - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY period) AS run
+          FROM habit_checkins)
+    GROUP BY habit_id, run
+    """,
+    "DROP TABLE habit_checkins",
+    # Habits are listed by start date; nothing reads status any more.
+    "DROP INDEX IF EXISTS idx_habits_user_id_status",
+    "CREATE INDEX IF NOT EXISTS idx_habits_user_id_start_date ON habits (user_id, start_date)",
+]
+
+
+def period_index(frequency, day):
+    """Number the day/week/month containing ``day`` so consecutive periods differ by 1."""
+    if frequency == "Weekly":
+        return (day.toordinal() - 1) // 7
+    if frequency == "Monthly":
+        return day.year * 12 + day.month - 1
+    return day.toordinal()
+
+
+def streak_summary(frequency, start_date, current_streak, last_period, checkin_count, today=None):
+    """Return ``(streak, done_this_period, completion_rate)`` from the stored counters."""
+    today_period = period_index(frequency, today or date.today())
+    alive = last_period is not None and last_period >= today_period - 1
+    elapsed = today_period - period_index(frequency, date.fromisoformat(start_date)) + 1
+    rate = min(checkin_count / elapsed, 1.0) if elapsed > 0 else 0.0
+    return (current_streak if alive else 0), last_period == today_period, rate
+
 
 class HabitDatabase:
     def __init__(self, db_path="data/habits.db"):
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.cache = ReadCache()
         self.create_table()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS habits (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            name TEXT,
-            frequency TEXT,
-            start_date TEXT,
-            status TEXT
-        )
-        """
-        self.conn.execute(query)
-        self.conn.commit()
+        db_utils.migrate(self.db_path, MIGRATIONS)
 
     def add_habit(self, user_id, name, frequency, start_date):
-        self.conn.execute(
-            "INSERT INTO habits (user_id, name, frequency, start_date, status) VALUES (?, ?, ?, ?, ?)",
-            (user_id, name, frequency, start_date, "Active"),
-        )
-        self.conn.commit()
-
-    def get_habits(self, user_id):
-        df = pd.read_sql_query("SELECT * FROM habits WHERE user_id = ?", self.conn, params=(user_id,))
-        return df
-
-    def mark_complete(self, habit_id):
-        self.conn.execute("UPDATE habits SET status = 'Completed' WHERE id = ?", (habit_id,))
-        self.conn.commit()
+        with db_utils.transaction(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO habits (user_id, name, frequency, start_date) VALUES (?, ?, ?, ?)",
+                (user_id, name, frequency, start_date),
+            )
+        self.cache.invalidate(user_id)
+
+    @cached_method
+    def get_habits_page(self, user_id, cursor=None, before=False,
+                        page_size=pagination.PAGE_SIZE, descending=False):
+        with db_utils.connection(self.db_path) as conn:
+            return pagination.fetch_page(
+                conn, "habits",
+                ["id", "name", "frequency", "start_date",
+                 "current_streak", "longest_streak", "last_period", "checkin_count"],
+                "user_id = ?", (user_id,), "start_date",
+                cursor=cursor, before=before, page_size=page_size, descending=descending,
+            )
+
+    def _owner(self, conn, habit_id):
+        row = conn.execute("SELECT user_id FROM habits WHERE id = ?", (habit_id,)).fetchone()
+        return row[0] if row else None
+
+    def check_in(self, habit_id, day=None):
+        """Record a check-in and update the streak counters in place.
+
+        The check-in extends, joins or starts a run in habit_runs, so even a
+        back-dated one touches at most two rows. Returns False if the habit
+        is unknown or already checked in for that period.
+        """
+        day = day or date.today()
+        with db_utils.transaction(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT user_id, frequency, current_streak, longest_streak, last_period FROM habits WHERE id = ?",
+                (habit_id,),
+            ).fetchone()
+            if row is None:
+                return False
+            user_id, frequency, current, longest, last = row
+            period = period_index(frequency, day)
+            before = conn.execute(
+                """SELECT first_period, last_period FROM habit_runs
+                   WHERE habit_id = ? AND first_period <= ? ORDER BY first_period DESC LIMIT 1""",
+                (habit_id, period),
+            ).fetchone()
+            if before is not None and before[1] >= period:
+                return False
+            after = conn.execute(
+                "SELECT last_period FROM habit_runs WHERE habit_id = ? AND first_period = ?",
+                (habit_id, period + 1),
+            ).fetchone()
+            first = before[0] if before is not None and before[1] == period - 1 else period
+            end = after[0] if after is not None else period
+            if after is not None:
+                conn.execute("DELETE FROM habit_runs WHERE habit_id = ? AND first_period = ?",
+                             (habit_id, period + 1))
+            conn.execute(
+                "INSERT OR REPLACE INTO habit_runs (habit_id, first_period, last_period) VALUES (?, ?, ?)",
+                (habit_id, first, end),
+            )
+            length = end - first + 1
+            if last is None or end >= last:
+                # The run now ends at the latest check-in, so it is the current streak.
+                current, last = length, end
+            conn.execute(
+                """UPDATE habits SET current_streak = ?, longest_streak = ?, last_period = ?,
+                   checkin_count = checkin_count + 1 WHERE id = ?""",
+                (current, max(longest, length), last, habit_id),
+            )
+        self.cache.invalidate(user_id)
+        return True
 
     def delete_habit(self, habit_id):
-        self.conn.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
-        self.conn.commit()
+        with db_utils.transaction(self.db_path) as conn:
+            user_id = self._owner(conn, habit_id)
+            conn.execute("DELETE FROM habit_runs WHERE habit_id = ?", (habit_id,))
+            conn.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+        self.cache.invalidate(user_id)
 
     def close(self):
-        self.conn.close()
+        db_utils.close_connection(self.db_path)
+
+
+@st.cache_resource
+def get_database():
+    # Shared by every session in the process; connections are pooled in db_utils.
+    return HabitDatabase()
 
 
 class HabitTrackerApp:
-    def __init__(self):
-        self.db = HabitDatabase()
+    def __init__(self, db=None):
+        self.db = db or get_database()
 
     def show(self):
         st.subheader("🧘 Habit Tracker")
@@ -74,25 +197,30 @@ class HabitTrackerApp:
 
     def display_habits(self, user_id):
         st.markdown("---")
-        df = self.db.get_habits(user_id)
+        page = pagination.current_page(
+            "habits", lambda cursor, before: self.db.get_habits_page(user_id, cursor, before)
+        )
 
-        if not df.empty:
+        if page.rows:
             st.subheader("📋 Your Habits")
-            for _, row in df.iterrows():
-                col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
-                col1.write(f"**{row['name']}**")
-                col2.write(f"{row['frequency']}")
-                col3.write(f"{row['start_date']}")
-                col4.write(f"Status: `{row['status']}`")
-
-                if row["status"] != "Completed":
-                    if col5.button("✅", key=f"complete_{row['id']}"):
-                        self.db.mark_complete(row["id"])
-                        st.rerun()
-                else:
-                    if col5.button("❌", key=f"delete_{row['id']}"):
-                        self.db.delete_habit(row["id"])
-                        st.rerun()
+            for (habit_id, name, frequency, start_date,
+                 current_streak, longest_streak, last_period, checkin_count) in page.rows:
+                streak, done, rate = streak_summary(
+                    frequency, start_date, current_streak, last_period, checkin_count
+                )
+                col1, col2, col3, col4, col5, col6 = st.columns([3, 2, 2, 2, 1, 1])
+                col1.write(f"**{name}**")
+                col2.write(f"{frequency} since {start_date}")
+                col3.write(f"🔥 {streak} (best {longest_streak})")
+                col4.write(f"Done: `{rate:.0%}`")
+
+                if col5.button("✅", key=f"checkin_{habit_id}", disabled=done):
+                    self.db.check_in(habit_id)
+                    st.rerun()
+                if col6.button("❌", key=f"delete_{habit_id}"):
+                    self.db.delete_habit(habit_id)
+                    st.rerun()
+            pagination.page_controls("habits", page)
         else:
             st.info("No habits tracked yet.")
 
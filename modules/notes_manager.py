@@ -1,48 +1,210 @@
 import streamlit as st
-import sqlite3
+import json
+import io
+import re
+import zipfile
 from datetime import datetime
-import pandas as pd
+from utils import db_utils, pagination
+from utils.cache import ReadCache, cached_method
+
+def _scope_fts_by_user(conn):
+    # Index the owner next to the text so a search is constrained to one user's
+    # notes inside MATCH instead of ranking every user's matches first. The owner
+    # is indexed as hex(user_id): a single token whatever the username contains.
+    # 'rebuild' would index the raw user_id from notes, so the index is filled here.
+    for trigger in ("notes_fts_insert", "notes_fts_delete", "notes_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS notes_fts")
+    conn.execute("""
+        CREATE VIRTUAL TABLE notes_fts
+        USING fts5(title, content, user_id, content='notes', content_rowid='id')
+    """)
+    conn.execute("""
+        CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts (rowid, title, content, user_id)
+            VALUES (new.id, new.title, new.content, hex(new.user_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, title, content, user_id)
+            VALUES ('delete', old.id, old.title, old.content, hex(old.user_id));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER notes_fts_update AFTER UPDATE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, title, content, user_id)
+            VALUES ('delete', old.id, old.title, old.content, hex(old.user_id));
+            INSERT INTO notes_fts (rowid, title, content, user_id)
+            VALUES (new.id, new.title, new.content, hex(new.user_id));
+        END
+    """)
+    conn.execute(
+        "INSERT INTO notes_fts (rowid, title, content, user_id) "
+        "SELECT id, title, content, hex(user_id) FROM notes"
+    )
+
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT,
+        title TEXT,
+        content TEXT,
+        timestamp TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_notes_user_id_timestamp ON notes (user_id, timestamp)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts
+    USING fts5(title, content, content='notes', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')",
+    _scope_fts_by_user,
+]
+
+SEARCH_PAGE_SIZE = 10
+EXPORT_CHUNK_SIZE = 500
+
+# format -> (label, file extension, mime type)
+EXPORT_FORMATS = {
+    "txt": ("Text (.txt)", "txt", "text/plain"),
+    "md": ("Markdown (.md)", "md", "text/markdown"),
+    "jsonl": ("JSON Lines (.jsonl)", "jsonl", "application/jsonl"),
+    "zip": ("Zip of Markdown files (.zip)", "zip", "application/zip"),
+}
+
+
+def to_fts_query(text, user_id=None):
+    # Quote every term so user input can't break MATCH syntax; prefix-match each one.
+    terms = ['"' + term.replace('"', '""') + '"*' for term in text.split()]
+    if not terms or user_id is None:
+        return " ".join(terms)
+    owner = user_id.encode("utf-8").hex().upper()
+    return f'user_id : "{owner}" AND {{title content}} : ({" ".join(terms)})'
+
 
 class NotesDatabase:
     def __init__(self, db_path="data/notes.db"):
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.cache = ReadCache()
         self.create_table()
 
     def create_table(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            title TEXT,
-            content TEXT,
-            timestamp TEXT
-        )
-        """
-        self.conn.execute(query)
-        self.conn.commit()
+        db_utils.migrate(self.db_path, MIGRATIONS)
 
     def add_note(self, user_id, title, content):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.conn.execute(
-            "INSERT INTO notes (user_id, title, content, timestamp) VALUES (?, ?, ?, ?)",
-            (user_id, title, content, timestamp)
-        )
-        self.conn.commit()
+        with db_utils.transaction(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO notes (user_id, title, content, timestamp) VALUES (?, ?, ?, ?)",
+                (user_id, title, content, timestamp)
+            )
+        self.cache.invalidate(user_id)
+
+    @cached_method
+    def get_notes_page(self, user_id, cursor=None, before=False,
+                       page_size=pagination.PAGE_SIZE, descending=True):
+        with db_utils.connection(self.db_path) as conn:
+            return pagination.fetch_page(
+                conn, "notes", ["id", "title", "content", "timestamp"],
+                "user_id = ?", (user_id,), "timestamp",
+                cursor=cursor, before=before, page_size=page_size, descending=descending,
+            )
+
+    def iter_notes(self, user_id, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield ``(id, title, content, timestamp)`` oldest first, a chunk at a time."""
+        cursor = None
+        while True:
+            # Export pages are read once; keep them out of the read cache.
+            page = NotesDatabase.get_notes_page.__wrapped__(
+                self, user_id, cursor, page_size=chunk_size, descending=False
+            )
+            yield from page.rows
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def export_notes(self, user_id, out, file_format="txt"):
+        """Write every note of the user to the binary file ``out``."""
+        notes = self.iter_notes(user_id)
+        if file_format == "zip":
+            with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+                for note_id, title, content, timestamp in notes:
+                    slug = re.sub(r"[^\w-]+", "_", title).strip("_")[:50] or "note"
+                    archive.writestr(f"{note_id}_{slug}.md", f"# {title}\n_{timestamp}_\n\n{content}\n")
+            return
+        for i, (note_id, title, content, timestamp) in enumerate(notes):
+            if file_format == "jsonl":
+                record = {"id": note_id, "title": title, "content": content, "timestamp": timestamp}
+                text = json.dumps(record, ensure_ascii=False) + "\n"
+            elif file_format == "md":
+                text = f"## {title}\n_{timestamp}_\n\n{content}\n\n"
+            else:
+                text = ("\n\n" if i else "") + f"{title} - {timestamp}\n{content}"
+            out.write(text.encode("utf-8"))
+
+    @cached_method
+    def search_notes(self, user_id, text, offset=0, page_size=SEARCH_PAGE_SIZE):
+        """Return bm25-ranked matches with highlighted snippets.
 
-    def get_notes(self, user_id):
-        return pd.read_sql_query("SELECT * FROM notes WHERE user_id = ?", self.conn, params=(user_id,))
+        Results are ranked, so the page cursors are plain row offsets.
+        """
+        fts_query = to_fts_query(text, user_id)
+        if not fts_query:
+            return pagination.Page([], None, None)
+        with db_utils.connection(self.db_path) as conn:
+            rows = conn.execute(
+                """
+                SELECT notes.id, notes.title,
+                       snippet(notes_fts, 1, '**', '**', '…', 16), notes.timestamp
+                FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+                WHERE notes_fts MATCH ?
+                ORDER BY bm25(notes_fts, 10.0, 1.0, 0.0)
+                LIMIT ? OFFSET ?
+                """,
+                (fts_query, page_size + 1, offset),
+            ).fetchall()
+        next_offset = offset + page_size if len(rows) > page_size else None
+        prev_offset = max(offset - page_size, 0) if offset else None
+        return pagination.Page(rows[:page_size], next_offset, prev_offset)
 
     def delete_note(self, note_id):
-        self.conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
-        self.conn.commit()
+        with db_utils.transaction(self.db_path) as conn:
+            row = conn.execute("SELECT user_id FROM notes WHERE id = ?", (note_id,)).fetchone()
+            conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        if row is not None:
+            self.cache.invalidate(row[0])
 
     def close(self):
-        self.conn.close()
+        db_utils.close_connection(self.db_path)
+
+
+@st.cache_resource
+def get_database():
+    # Shared by every session in the process; connections are pooled in db_utils.
+    return NotesDatabase()
 
 
 class NotesApp:
-    def __init__(self):
-        self.db = NotesDatabase()
+    def __init__(self, db=None):
+        self.db = db or get_database()
 
     def show(self):
         st.subheader("📝 Notes Manager")
@@ -68,30 +230,71 @@ class NotesApp:
             elif submitted:
                 st.warning("⚠️ Please fill both Title and Note.")
 
+    def display_search(self, user_id):
+        query = st.text_input("🔍 Search notes")
+        if query != st.session_state.get("notes_search_query"):
+            st.session_state["notes_search_query"] = query
+            pagination.reset_position("notes_search")
+        if not query.strip():
+            return False
+
+        page = pagination.current_page(
+            "notes_search", lambda offset, before: self.db.search_notes(user_id, query, offset or 0)
+        )
+        if page.rows:
+            for note_id, title, snippet, timestamp in page.rows:
+                st.markdown(f"**{title}** — _{timestamp}_")
+                st.markdown(snippet)
+            pagination.page_controls("notes_search", page)
+        else:
+            st.info("No notes match your search.")
+        return True
+
     def display_notes(self, user_id):
         st.markdown("---")
-        df = self.db.get_notes(user_id)
+        if self.display_search(user_id):
+            return
+        page = pagination.current_page(
+            "notes", lambda cursor, before: self.db.get_notes_page(user_id, cursor, before)
+        )
 
-        if not df.empty:
+        if page.rows:
             st.subheader("📚 Your Notes")
-            for _, row in df.iterrows():
+            for note_id, title, content, timestamp in page.rows:
                 col1, col2 = st.columns([9, 1])
                 with col1:
-                    st.markdown(f"**{row['title']}** — _{row['timestamp']}_")
-                    st.write(row["content"])
+                    st.markdown(f"**{title}** — _{timestamp}_")
+                    st.write(content)
                 with col2:
-                    if st.button("🗑️", key=f"delete_{row['id']}"):
-                        self.db.delete_note(row["id"])
+                    if st.button("🗑️", key=f"delete_{note_id}"):
+                        self.db.delete_note(note_id)
                         st.rerun()
+            pagination.page_controls("notes", page)
 
-            # Export as .txt
-            all_text = "\n\n".join(
-                [f"{row['title']} - {row['timestamp']}\n{row['content']}" for _, row in df.iterrows()]
-            )
-            st.download_button("📥 Download Notes (.txt)", all_text, file_name="my_notes.txt")
+            self.display_export(user_id)
         else:
             st.info("You have not added any notes yet.")
 
+    def display_export(self, user_id):
+        file_format = st.selectbox(
+            "Export format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0]
+        )
+        _, extension, mime = EXPORT_FORMATS[file_format]
+        # The export is only generated when the button is clicked. Streamlit then
+        # holds the whole file in memory to serve it, so it is built in a BytesIO.
+        st.download_button(
+            "📥 Download Notes",
+            data=lambda: self._export_file(user_id, file_format),
+            file_name=f"my_notes.{extension}",
+            mime=mime,
+        )
+
+    def _export_file(self, user_id, file_format):
+        out = io.BytesIO()
+        self.db.export_notes(user_id, out, file_format)
+        out.seek(0)
+        return out
+
 def run():
     app = NotesApp()
     app.show()
@@ -1,45 +1,107 @@
 import streamlit as st
-import sqlite3
+from datetime import date, timedelta
+from utils import db_utils, pagination
+from utils.cache import ReadCache
 
 DB_PATH = "data/tasks.db"
 
+MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS tasks
+       (id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT,
+        title TEXT,
+        description TEXT,
+        deadline TEXT,
+        priority TEXT)''',
+    "CREATE INDEX IF NOT EXISTS idx_tasks_username_deadline ON tasks (username, deadline)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_username_deadline_priority ON tasks (username, deadline, priority)",
+    "DROP INDEX IF EXISTS idx_tasks_username_deadline",
+    # Listings keyset-paginate on (deadline, id), which needs the rowid right
+    # after deadline; the agenda sorts on a CASE over priority either way.
+    "CREATE INDEX IF NOT EXISTS idx_tasks_username_deadline ON tasks (username, deadline)",
+    "DROP INDEX IF EXISTS idx_tasks_username_deadline_priority",
+]
+
+AGENDA_BUCKETS = ["Overdue", "Today", "This Week"]
+# Tasks have no done state, so only recent misses are shown as overdue.
+OVERDUE_DAYS = 30
+AGENDA_PAGE_SIZE = 10
+
+read_cache = ReadCache()
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS tasks
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  username TEXT,
-                  title TEXT,
-                  description TEXT,
-                  deadline TEXT,
-                  priority TEXT)''')
-    conn.commit()
-    conn.close()
+    db_utils.migrate(DB_PATH, MIGRATIONS)
 
 def add_task(username, title, description, deadline, priority):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO tasks (username, title, description, deadline, priority)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (username, title, description, deadline, priority))
-    conn.commit()
-    conn.close()
-
-def get_tasks(username):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT id, title, description, deadline, priority FROM tasks WHERE username=?', (username,))
-    data = c.fetchall()
-    conn.close()
-    return data
+    with db_utils.transaction(DB_PATH) as conn:
+        conn.execute('''
+            INSERT INTO tasks (username, title, description, deadline, priority)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (username, title, description, deadline, priority))
+    read_cache.invalidate(username)
+
+@read_cache.cached
+def get_tasks_page(username, cursor=None, before=False, page_size=pagination.PAGE_SIZE, descending=False):
+    with db_utils.connection(DB_PATH) as conn:
+        return pagination.fetch_page(
+            conn, "tasks", ["id", "title", "description", "deadline", "priority"],
+            "username = ?", (username,), "deadline",
+            cursor=cursor, before=before, page_size=page_size, descending=descending,
+        )
+
+def agenda_ranges(today, days=7):
+    """Return {bucket: (first, last)} deadline bounds, both inclusive, for ``today``."""
+    def day(offset):
+        return (today + timedelta(days=offset)).isoformat()
+    return {
+        "Overdue": (day(-OVERDUE_DAYS), day(-1)),
+        "Today": (day(0), day(0)),
+        "This Week": (day(1), day(days)),
+    }
+
+def get_agenda_page(username, bucket, offset=0, today=None, days=7, page_size=AGENDA_PAGE_SIZE):
+    """One page of the tasks in an agenda ``bucket``, highest priority first.
+
+    Buckets are ranked by priority rather than by a unique key, so the
+    page cursors are plain row offsets.
+    """
+    first, last = agenda_ranges(today or date.today(), days)[bucket]
+    return _get_agenda_page(username, first, last, offset, page_size)
+
+@read_cache.cached
+def _get_agenda_page(username, first, last, offset, page_size):
+    # Bounding deadline on both sides keeps the scan to the bucket's slice of
+    # (username, deadline, priority) and skips tasks without a deadline.
+    with db_utils.connection(DB_PATH) as conn:
+        rows = conn.execute('''
+            SELECT id, title, description, deadline, priority
+            FROM tasks
+            WHERE username = ? AND deadline BETWEEN ? AND ?
+            ORDER BY CASE priority WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 ELSE 2 END,
+                     deadline, id
+            LIMIT ? OFFSET ?
+        ''', (username, first, last, page_size + 1, offset)).fetchall()
+    next_offset = offset + page_size if len(rows) > page_size else None
+    prev_offset = max(offset - page_size, 0) if offset else None
+    return pagination.Page(rows[:page_size], next_offset, prev_offset)
 
 def delete_task(task_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    conn.close()
+    with db_utils.transaction(DB_PATH) as conn:
+        row = conn.execute("SELECT username FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    if row is not None:
+        read_cache.invalidate(row[0])
+
+def render_task(task):
+    task_id, title, description, deadline, priority = task
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
+    col1.write(f"**{title}**")
+    col2.write(f"📅 {deadline}")
+    col3.write(f"⭐ {priority}")
+    col4.write(f"📝 {description}")
+    if col5.button("❌", key=f"del-{task_id}"):
+        delete_task(task_id)
+        st.rerun()
 
 def run():
     st.subheader("🗓️ Task Manager")
@@ -63,15 +125,27 @@ def run():
             st.success("✅ Task added!")
 
     st.markdown("---")
+    view = st.radio("View", ["Agenda", "All Tasks"], horizontal=True)
+    if view == "Agenda":
+        for bucket in AGENDA_BUCKETS:
+            st.subheader(f"📌 {bucket}")
+            key = f"agenda_{bucket.lower().replace(' ', '_')}"
+            page = pagination.current_page(
+                key, lambda offset, before, bucket=bucket: get_agenda_page(username, bucket, offset or 0)
+            )
+            if not page.rows:
+                st.info(f"No tasks {bucket.lower()}." if bucket != "Overdue"
+                        else f"Nothing overdue in the last {OVERDUE_DAYS} days.")
+                continue
+            for task in page.rows:
+                render_task(task)
+            pagination.page_controls(key, page)
+        return
+
     st.subheader("📋 Your Tasks")
-    tasks = get_tasks(username)
-    for task in tasks:
-        task_id, title, description, deadline, priority = task
-        col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
-        col1.write(f"**{title}**")
-        col2.write(f"📅 {deadline}")
-        col3.write(f"⭐ {priority}")
-        col4.write(f"📝 {description}")
-        if col5.button("❌", key=f"del-{task_id}"):
-            delete_task(task_id)
-            st.rerun()
+    page = pagination.current_page(
+        "tasks", lambda cursor, before: get_tasks_page(username, cursor, before)
+    )
+    for task in page.rows:
+        render_task(task)
+    pagination.page_controls("tasks", page)
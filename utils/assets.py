@@ -0,0 +1,96 @@
+"""Right-sized image variants served from Streamlit's static directory.
+
+Variants are rendered once (on first use, or ahead of time with
+``python -m utils.assets``) into ``static/generated`` under a name that
+includes a hash of the source file, so browsers can keep them cached and
+an edited source gets a new URL. Without ``server.enableStaticServing``
+the variant is inlined as a cached data URI instead.
+"""
+import base64
+import hashlib
+import os
+from functools import lru_cache
+
+import streamlit as st
+from PIL import Image, ImageSequence
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATED_DIR = os.path.join(ROOT_DIR, "static", "generated")
+STATIC_URL = "app/static/generated"
+
+# name -> (source image, bounding box of the rendered variant)
+VARIANTS = {
+    "sehatbot_avatar": ("assets/image1.png", (150, 150)),
+    "doctorbot_sidebar": ("assets/image4.gif", (320, 320)),
+}
+
+
+def _render(source, target, size):
+    with Image.open(source) as image:
+        if getattr(image, "n_frames", 1) > 1:
+            frames = []
+            for frame in ImageSequence.Iterator(image):
+                frame = frame.convert("RGB")
+                frame.thumbnail(size)
+                frames.append(frame)
+            # Animated WebP is roughly a tenth of the size of an equivalent GIF.
+            frames[0].save(
+                target, format="WEBP", save_all=True, append_images=frames[1:], quality=80,
+                duration=image.info.get("duration", 100), loop=image.info.get("loop", 0),
+            )
+        else:
+            image = image.copy()
+            image.thumbnail(size)
+            image.save(target, format="PNG", optimize=True)
+
+
+@lru_cache(maxsize=64)
+def _build(source, mtime_ns, size):
+    with open(source, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    stem, ext = os.path.splitext(os.path.basename(source))
+    ext = ".webp" if ext.lower() == ".gif" else ".png"
+    filename = f"{stem}-{digest}-{size[0]}x{size[1]}{ext}"
+    target = os.path.join(GENERATED_DIR, filename)
+    if not os.path.exists(target):
+        os.makedirs(GENERATED_DIR, exist_ok=True)
+        partial = f"{target}.{os.getpid()}.tmp"
+        _render(source, partial, size)
+        os.replace(partial, target)
+    return filename
+
+
+def variant_file(name):
+    """Return the generated file name for a variant, rendering it if needed."""
+    source, size = VARIANTS[name]
+    # Keyed on mtime so an edited source is picked up without a restart.
+    return _build(source, os.stat(source).st_mtime_ns, size)
+
+
+def url(name):
+    return f"{STATIC_URL}/{variant_file(name)}"
+
+
+@lru_cache(maxsize=64)
+def _encode(filename):
+    with open(os.path.join(GENERATED_DIR, filename), "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
+def data_uri(name):
+    filename = variant_file(name)
+    mime = "image/webp" if filename.endswith(".webp") else "image/png"
+    return f"data:{mime};base64,{_encode(filename)}"
+
+
+def src(name):
+    """Image ``src`` for a variant: a static URL, or a data URI if static serving is off."""
+    if st.get_option("server.enableStaticServing"):
+        return url(name)
+    return data_uri(name)
+
+
+if __name__ == "__main__":
+    for variant in VARIANTS:
+        path = os.path.join(GENERATED_DIR, variant_file(variant))
+        print(f"{variant}: {path} ({os.path.getsize(path) / 1024:.1f} KB)")
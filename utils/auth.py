@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import streamlit_authenticator as stauth
+
+from utils import user_store
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# bcrypt releases the GIL, so a small pool keeps hashing off the script
+# thread and caps how many hashes run at once.
+_pool = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def hash_password(password, rounds=None):
+    return _pool.submit(_hash, password, rounds or BCRYPT_ROUNDS).result()
+
+
+def verify_password(password, hashed):
+    return _pool.submit(bcrypt.checkpw, password.encode(), hashed.encode()).result()
+
+
+class Authenticator(stauth.Authenticate):
+    """streamlit_authenticator backed by the user store.
+
+    Passwords are checked on the bcrypt pool. Reruns of an authenticated
+    session already return early from ``login`` on
+    ``st.session_state["authentication_status"]``.
+    """
+
+    def __init__(self, cookie_name, key, cookie_expiry_days=30.0):
+        super().__init__({"usernames": {}}, cookie_name, key, cookie_expiry_days)
+        # Look users up on demand instead of handing every account to the authenticator.
+        self.credentials["usernames"] = user_store.UserCredentials()
+
+    def _check_pw(self):
+        return verify_password(self.password, self.credentials["usernames"][self.username]["password"])
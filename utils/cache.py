@@ -0,0 +1,73 @@
+import functools
+import threading
+from collections import OrderedDict
+
+
+class ReadCache:
+    """Bounded LRU cache for per-user reads.
+
+    Every key includes the user's write generation, so bumping it with
+    ``invalidate`` makes all of that user's cached reads unreachable; the
+    stale entries then age out of the LRU.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        # Bumped by clear(), so versions handed out before it stop matching.
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, user, key, loader):
+        with self._lock:
+            full_key = (user, self._generations.get(user, 0), key)
+            if full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return self._entries[full_key]
+            self.misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[full_key] = value
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, user):
+        with self._lock:
+            self._generations[user] = self._generations.get(user, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def version(self, user):
+        """A token that changes whenever the user's data does, or the cache is cleared."""
+        with self._lock:
+            return self._epoch, self._generations.get(user, 0)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def cached(self, func):
+        """Decorate a read whose first argument is the user."""
+        @functools.wraps(func)
+        def wrapper(user, *args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            return self.get_or_load(user, key, lambda: func(user, *args, **kwargs))
+        return wrapper
+
+
+def cached_method(func):
+    """Like ``ReadCache.cached`` for methods, using the instance's ``cache``."""
+    @functools.wraps(func)
+    def wrapper(self, user, *args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        return self.cache.get_or_load(user, key, lambda: func(self, user, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,97 @@
+"""Chart builders for the tracker pages.
+
+Data is aggregated before it reaches plotly (in SQL, or vectorized pandas
+over already-aggregated rows) and time series are resampled to coarser
+periods when they would exceed MAX_POINTS, so a figure stays small no
+matter how much history a user has.
+
+Built figures are kept in ``figure_cache`` under the chart name and the
+caller's data version; a page passes the version of the data it plotted
+(e.g. ``ReadCache.version(user)``) and gets the same figure back until
+that data changes.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.express as px
+
+MAX_POINTS = 120
+
+# label -> pandas period frequency, finest first.
+PERIODS = {"Month": "M", "Quarter": "Q", "Year": "Y"}
+
+
+class FigureCache:
+    """Latest figure per chart key, rebuilt when the data version changes."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, version, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        figure = build()
+        with self._lock:
+            self._entries[key] = (version, figure)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+figure_cache = FigureCache()
+
+
+def category_pie(totals, title):
+    """Pie of a ``category``/``amount`` frame that is already summed per category."""
+    return px.pie(totals, values="amount", names="category", title=title)
+
+
+def resample_periods(monthly, period="Month", max_points=MAX_POINTS):
+    """Sum monthly totals into ``period`` buckets, with gaps filled with zero.
+
+    ``monthly`` has ``month`` ("YYYY-MM"), ``series`` and ``total`` columns.
+    Returns a wide frame indexed by period start with one column per series,
+    switching to a coarser period if ``period`` would give more than
+    ``max_points`` buckets. The second value is the period actually used.
+    """
+    months = pd.PeriodIndex(monthly["month"], freq="M")
+    labels = list(PERIODS)
+    for label in labels[labels.index(period):]:
+        buckets = months.asfreq(PERIODS[label])
+        span = pd.period_range(buckets.min(), buckets.max(), freq=PERIODS[label])
+        if len(span) <= max_points or label == labels[-1]:
+            break
+    wide = (
+        monthly.assign(bucket=buckets)
+        .pivot_table(index="bucket", columns="series", values="total", aggfunc="sum", fill_value=0)
+        .reindex(span, fill_value=0)
+    )
+    wide.index = wide.index.to_timestamp()
+    return wide, label
+
+
+def trend(monthly, title, period="Month", max_points=MAX_POINTS, colors=None):
+    """Grouped bars of per-period totals for each series, e.g. income against expense."""
+    wide, label = resample_periods(monthly, period, max_points)
+    long = wide.reset_index(names="period").melt(id_vars="period", var_name="series", value_name="total")
+    figure = px.bar(
+        long, x="period", y="total", color="series", barmode="group",
+        color_discrete_map=colors, title=f"{title} (by {label.lower()})",
+        labels={"period": label, "total": "Amount", "series": ""},
+    )
+    return figure
@@ -0,0 +1,103 @@
+import atexit
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# One long-lived connection per database file, shared by every session in the
+# process. Access is serialized with a per-database lock.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+_connections = {}
+_locks = {}
+_schemas_ready = set()
+_registry_lock = threading.Lock()
+
+
+def _lock_for(db_path):
+    with _registry_lock:
+        return _locks.setdefault(db_path, threading.RLock())
+
+
+def get_connection(db_path):
+    with _registry_lock:
+        conn = _connections.get(db_path)
+        if conn is None:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            _connections[db_path] = conn
+        return conn
+
+
+@contextmanager
+def connection(db_path):
+    """Borrow the shared connection for reads."""
+    with _lock_for(db_path):
+        yield get_connection(db_path)
+
+
+@contextmanager
+def transaction(db_path):
+    """Borrow the shared connection inside a write transaction.
+
+    Nested calls join the outer transaction, so helpers can be composed.
+    """
+    with _lock_for(db_path):
+        conn = get_connection(db_path)
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def migrate(db_path, migrations):
+    """Bring the database up to date, once per process.
+
+    ``migrations`` is ordered; entry ``i`` moves the schema to version
+    ``i + 1``. Each entry is an SQL statement or a callable taking the
+    connection. Applied versions are recorded in ``schema_version``.
+    """
+    if db_path in _schemas_ready:
+        return
+    with transaction(db_path) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+        current = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()[0] or 0
+        for version, migration in enumerate(migrations[current:], start=current + 1):
+            if callable(migration):
+                migration(conn)
+            else:
+                conn.execute(migration)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+    _schemas_ready.add(db_path)
+
+
+def close_connection(db_path):
+    with _lock_for(db_path):
+        with _registry_lock:
+            conn = _connections.pop(db_path, None)
+        if conn is not None:
+            conn.close()
+
+
+def close_all():
+    for db_path in list(_connections):
+        close_connection(db_path)
+
+
+atexit.register(close_all)
@@ -0,0 +1,290 @@
+"""Shared Gemini client used by the AI tools.
+
+Every upstream call goes through one process-wide layer:
+
+- the API key is configured once and models are built once per name;
+- a token bucket caps the request rate (LLM_RATE_PER_MINUTE, LLM_BURST);
+- a fixed pool of LLM_MAX_CONCURRENCY workers bounds concurrent calls;
+- quota and transient server errors are retried with exponential backoff,
+  as long as no text has been handed out yet;
+- identical prompts that are already in flight share a single upstream
+  call, and each caller replays the same stream of chunks.
+
+The upstream itself is pluggable: ``GeminiBackend`` calls
+google.generativeai, ``OfflineBackend`` is an in-process stand-in with
+configurable latency, streaming and error injection for load tests and
+benchmarks. ``LLM_BACKEND=offline`` selects the stand-in.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "models/gemini-1.5-flash"
+RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "60"))
+BURST = int(os.getenv("LLM_BURST", "10"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+BACKOFF_SECONDS = 1.0
+
+# Most recent generations: {"label", "first_token", "total"} in seconds.
+LATENCY_SAMPLES = deque(maxlen=500)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class SharedStream:
+    """Chunks of one upstream call, replayable by any number of readers."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def put(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: i < len(self.chunks) or self.done)
+                if i < len(self.chunks):
+                    chunk = self.chunks[i]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            i += 1
+            yield chunk
+
+
+_bucket = TokenBucket(RATE_PER_MINUTE / 60, BURST)
+_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="llm")
+_in_flight = {}
+_lock = threading.Lock()
+_stats = {"requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0, "throttled_seconds": 0.0}
+
+
+@lru_cache(maxsize=1)
+def configure():
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+@lru_cache(maxsize=None)
+def get_model(model_name=DEFAULT_MODEL):
+    import google.generativeai as genai
+
+    configure()
+    return genai.GenerativeModel(model_name)
+
+
+def stream_text(model, prompt):
+    """Yield the text of a streamed ``generate_content`` call chunk by chunk."""
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) raise on .text.
+            continue
+        if text:
+            yield text
+
+
+class LLMBackend:
+    name = None
+
+    def stream(self, model_name, prompt):
+        """Yield the response text to ``prompt`` chunk by chunk."""
+        raise NotImplementedError()
+
+    def is_retryable(self, exc):
+        return False
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def stream(self, model_name, prompt):
+        return stream_text(get_model(model_name), prompt)
+
+    def is_retryable(self, exc):
+        from google.api_core import exceptions
+
+        return isinstance(exc, (
+            exceptions.TooManyRequests, exceptions.ServiceUnavailable,
+            exceptions.InternalServerError, exceptions.DeadlineExceeded, ConnectionError,
+        ))
+
+
+class OfflineError(Exception):
+    """Simulated quota or server error raised by OfflineBackend."""
+
+
+class OfflineBackend(LLMBackend):
+    """Answers every prompt with filler text after a simulated delay.
+
+    ``error_rate`` is the chance that a call fails before its first chunk
+    (retryable, like a quota error); ``midstream_error_rate`` the chance
+    that it fails after some text has been streamed.
+    """
+    name = "offline"
+
+    def __init__(self, first_token=0.4, per_chunk=0.03, chunks=40,
+                 error_rate=0.0, midstream_error_rate=0.0, seed=None):
+        self.first_token = first_token
+        self.per_chunk = per_chunk
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.midstream_error_rate = midstream_error_rate
+        self._random = random.Random(seed)
+
+    def stream(self, model_name, prompt):
+        if not isinstance(prompt, str):
+            # Chat turns: answer the latest one.
+            prompt = prompt[-1]["parts"][0]
+        time.sleep(self.first_token)
+        if self._random.random() < self.error_rate:
+            raise OfflineError("simulated 429: quota exceeded")
+        fail_at = self._random.randrange(1, self.chunks) if self._random.random() < self.midstream_error_rate else None
+        topic = " ".join(prompt.split()[:8])
+        yield f"[{model_name}] Offline answer about: {topic}."
+        for i in range(1, self.chunks):
+            if i == fail_at:
+                raise OfflineError("simulated 500: stream interrupted")
+            time.sleep(self.per_chunk)
+            yield f" Sentence {i} of a simulated response."
+
+    def is_retryable(self, exc):
+        return isinstance(exc, OfflineError)
+
+
+BACKENDS = {"gemini": GeminiBackend, "offline": OfflineBackend}
+
+
+def get_backend():
+    return BACKENDS[os.getenv("LLM_BACKEND", "gemini")]()
+
+
+_backend = get_backend()
+
+
+def current_backend():
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the upstream for every tool, e.g. to an OfflineBackend in benchmarks."""
+    global _backend
+    _backend = backend
+
+
+def _pump(key, model_name, prompt, shared):
+    backend = _backend
+    try:
+        for attempt in range(MAX_RETRIES + 1):
+            waited = _bucket.acquire()
+            with _lock:
+                _stats["upstream_calls"] += 1
+                _stats["throttled_seconds"] += waited
+            try:
+                for chunk in backend.stream(model_name, prompt):
+                    shared.put(chunk)
+                break
+            except Exception as exc:
+                # Readers may already have shown part of the answer; only a
+                # call that produced nothing can be repeated transparently.
+                if shared.chunks or attempt == MAX_RETRIES or not backend.is_retryable(exc):
+                    raise
+                delay = BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning("%s failed (%s); retrying in %.1fs", model_name, exc, delay)
+                with _lock:
+                    _stats["retries"] += 1
+                time.sleep(delay)
+    except Exception as exc:
+        shared.finish(exc)
+    else:
+        shared.finish()
+    finally:
+        with _lock:
+            _in_flight.pop(key, None)
+
+
+def stream(prompt, model_name=DEFAULT_MODEL):
+    """Stream the response to ``prompt`` (a string or a list of chat turns)."""
+    payload = json.dumps([model_name, prompt], sort_keys=True, ensure_ascii=False)
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    with _lock:
+        _stats["requests"] += 1
+        shared = _in_flight.get(key)
+        if shared is None:
+            shared = _in_flight[key] = SharedStream()
+            _pool.submit(_pump, key, model_name, prompt, shared)
+        else:
+            _stats["coalesced"] += 1
+    return iter(shared)
+
+
+def generate(prompt, model_name=DEFAULT_MODEL):
+    return "".join(stream(prompt, model_name))
+
+
+def stats():
+    with _lock:
+        return dict(_stats, in_flight=len(_in_flight))
+
+
+def timed(label, chunks):
+    """Pass ``chunks`` through, recording time to first chunk and total time."""
+    started = time.perf_counter()
+    first_token = None
+    for chunk in chunks:
+        if first_token is None:
+            first_token = time.perf_counter() - started
+        yield chunk
+    total = time.perf_counter() - started
+    LATENCY_SAMPLES.append({"label": label, "first_token": first_token, "total": total})
+    logger.info("%s: first token %.3fs, total %.3fs", label, first_token or total, total)
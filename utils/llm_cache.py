@@ -0,0 +1,132 @@
+"""Content-addressed cache for LLM responses.
+
+Responses are keyed on a hash of (model, whitespace-normalized prompt,
+generation parameters). Callers pass the name of the LLM backend as one of
+the parameters, so answers from the offline stand-in are never served as
+Gemini answers. Hot entries live in an in-memory LRU in front of a SQLite
+table on disk; both tiers honour the same TTL.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from utils import db_utils
+
+DB_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+DEFAULT_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS llm_cache
+    (key TEXT PRIMARY KEY,
+     model TEXT NOT NULL,
+     response TEXT NOT NULL,
+     created_at REAL NOT NULL,
+     accessed_at REAL NOT NULL)
+    ''',
+    "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at ON llm_cache (accessed_at)",
+]
+
+
+def cache_key(model, prompt, **params):
+    normalized = " ".join(prompt.split())
+    payload = json.dumps([model, normalized, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, db_path=DB_PATH, ttl=DEFAULT_TTL, max_memory_entries=256, max_disk_entries=10_000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, response, created_at):
+        with self._lock:
+            self._memory[key] = (response, created_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+        db_utils.migrate(self.db_path, MIGRATIONS)
+        with db_utils.transaction(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            elif row is not None:
+                conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key, model, response):
+        now = time.time()
+        db_utils.migrate(self.db_path, MIGRATIONS)
+        with db_utils.transaction(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_disk_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+        self._remember(key, response, now)
+
+    def stream_or_generate(self, model, prompt, stream, **params):
+        """Yield the cached response in one piece, or relay ``stream()`` and cache the result.
+
+        Nothing is cached if the stream is abandoned or fails part-way.
+        """
+        key = cache_key(model, prompt, **params)
+        response = self.get(key)
+        if response is not None:
+            yield response
+            return
+        parts = []
+        for chunk in stream():
+            parts.append(chunk)
+            yield chunk
+        self.set(key, model, "".join(parts))
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+
+
+response_cache = LLMCache()
@@ -0,0 +1,73 @@
+from collections import namedtuple
+
+import streamlit as st
+
+PAGE_SIZE = 20
+
+# ``next_cursor``/``prev_cursor`` are ``(sort_value, id)`` keys, or None at
+# either end of the listing.
+Page = namedtuple("Page", ["rows", "next_cursor", "prev_cursor"])
+
+
+def fetch_page(conn, table, columns, where, params, sort_column,
+               cursor=None, before=False, page_size=PAGE_SIZE, descending=False):
+    """Keyset-paginate ``table`` ordered by ``(sort_column, id)``.
+
+    ``columns`` must include both ``sort_column`` and ``id``. Pass the
+    ``prev_cursor`` of a page with ``before=True`` to step backwards.
+    """
+    sort_pos = columns.index(sort_column)
+    id_pos = columns.index("id")
+    reverse = descending != before
+    op = "<" if reverse else ">"
+    order = "DESC" if reverse else "ASC"
+
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE {where}"
+    args = list(params)
+    if cursor is not None:
+        query += f" AND ({sort_column}, id) {op} (?, ?)"
+        args.extend(cursor)
+    query += f" ORDER BY {sort_column} {order}, id {order} LIMIT ?"
+    args.append(page_size + 1)
+
+    rows = conn.execute(query, args).fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if before:
+        rows.reverse()
+    if not rows:
+        return Page(rows, None, None)
+
+    first = (rows[0][sort_pos], rows[0][id_pos])
+    last = (rows[-1][sort_pos], rows[-1][id_pos])
+    if before:
+        return Page(rows, last, first if has_more else None)
+    return Page(rows, last if has_more else None, first if cursor is not None else None)
+
+
+def current_page(key, fetch):
+    """Load the page stored in session state for the listing ``key``.
+
+    ``fetch(cursor, before)`` returns a Page. Falls back to the first page
+    when the stored position no longer has rows (e.g. after deletes).
+    """
+    cursor, before = st.session_state.get(f"page_{key}", (None, False))
+    page = fetch(cursor, before)
+    if not page.rows and cursor is not None:
+        reset_position(key)
+        page = fetch(None, False)
+    return page
+
+
+def reset_position(key):
+    st.session_state.pop(f"page_{key}", None)
+
+
+def page_controls(key, page):
+    col1, col2 = st.columns(2)
+    if col1.button("◀ Prev", key=f"prev_{key}", disabled=page.prev_cursor is None):
+        st.session_state[f"page_{key}"] = (page.prev_cursor, True)
+        st.rerun()
+    if col2.button("Next ▶", key=f"next_{key}", disabled=page.next_cursor is None):
+        st.session_state[f"page_{key}"] = (page.next_cursor, False)
+        st.rerun()
@@ -0,0 +1,261 @@
+"""In-memory PDF reports shared by the SmartKit tools.
+
+``render_report(title, sections)`` returns the PDF as bytes, ready for
+``st.download_button``; nothing is written to disk. Rendered reports are
+kept in a small LRU keyed on a hash of their content, so asking for the
+same report again (every rerun after a download, or another session with
+the same data) does not lay it out again.
+
+Text is set in Unicode TrueType fonts so Urdu and Hindi come out
+readable: a Latin base font with Arabic-script and Devanagari fallbacks,
+shaped with HarfBuzz when uharfbuzz is installed. Fonts are looked up in
+assets/fonts (or PDF_FONT_DIR), then in the usual system locations. The
+deployment installs them through packages.txt (fonts-noto-core puts
+NotoNaskhArabic and NotoSansDevanagari under /usr/share/fonts/truetype/noto).
+If the fonts found lack core Urdu or Hindi letters, that is logged once,
+and each report containing characters no font can render logs them.
+Without any Unicode font the report falls back to Helvetica, and
+characters outside Latin-1 are replaced.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+
+from fpdf import FPDF
+from fpdf.fonts import FontFace
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FONT_DIR = os.getenv("PDF_FONT_DIR", os.path.join(ROOT_DIR, "assets", "fonts"))
+CACHE_BYTES = int(os.getenv("PDF_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# role -> candidate font files, first match wins. Bare names are looked up in FONT_DIR.
+FONT_CANDIDATES = {
+    "latin": [
+        "NotoSans-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "C:/Windows/Fonts/arial.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+    ],
+    "arabic": [
+        "NotoNaskhArabic-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf",
+        "C:/Windows/Fonts/arial.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+    ],
+    "devanagari": [
+        "NotoSansDevanagari-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+        "C:/Windows/Fonts/Nirmala.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+    ],
+}
+
+
+# role -> (first, last) code points of the script a fallback font is there for.
+SCRIPT_RANGES = {
+    "arabic": [(0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)],
+    "devanagari": [(0x0900, 0x097F)],
+}
+
+
+@lru_cache(maxsize=1)
+def find_fonts():
+    """Return {role: font path} for the roles a font was found for."""
+    fonts = {}
+    for role, candidates in FONT_CANDIDATES.items():
+        for candidate in candidates:
+            path = candidate if os.path.isabs(candidate) else os.path.join(FONT_DIR, candidate)
+            if os.path.exists(path):
+                fonts[role] = path
+                break
+    if "latin" not in fonts:
+        # matplotlib is already a dependency and ships DejaVu Sans.
+        try:
+            import matplotlib
+
+            fonts["latin"] = os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf")
+        except ImportError:
+            logger.warning("No Unicode font found; PDF reports are limited to Latin-1")
+    return fonts
+
+
+# role -> code points a font needs to render the script: alef plus the core
+# Urdu letters beyond basic Arabic (tteh, ddal, rreh, noon ghunna, do-chashmi
+# heh, heh goal, farsi yeh, yeh barree, full stop), and for Devanagari
+# anusvara, ka, ra, ha, the aa/i/e vowel signs, virama and danda.
+SCRIPT_PROBES = {
+    "arabic": [0x0627, 0x0679, 0x0688, 0x0691, 0x06BA, 0x06BE, 0x06C1, 0x06CC, 0x06D2, 0x06D4],
+    "devanagari": [0x0902, 0x0915, 0x0930, 0x0939, 0x093E, 0x093F, 0x0947, 0x094D, 0x0964],
+}
+
+
+@lru_cache(maxsize=1)
+def covered_code_points():
+    """Code points at least one of the fonts from ``find_fonts`` has a glyph for."""
+    from fontTools.ttLib import TTFont
+
+    covered = set()
+    for path in find_fonts().values():
+        with TTFont(path, lazy=True) as font:
+            covered.update(font.getBestCmap())
+    return frozenset(covered)
+
+
+@lru_cache(maxsize=1)
+def missing_scripts():
+    """Return the SCRIPT_PROBES roles that the available fonts don't fully cover."""
+    covered = covered_code_points()
+    missing = set()
+    for role, probes in SCRIPT_PROBES.items():
+        absent = [code_point for code_point in probes if code_point not in covered]
+        if absent:
+            logger.warning(
+                "No complete %s font found (no glyphs for %s); such text in PDF reports "
+                "will have missing glyphs. Install fonts-noto-core (see packages.txt), "
+                "or put %s in %s or PDF_FONT_DIR.",
+                role, " ".join(f"U+{code_point:04X}" for code_point in absent),
+                FONT_CANDIDATES[role][0], FONT_DIR,
+            )
+            missing.add(role)
+    return missing
+
+
+def _unrendered(texts):
+    """Characters of the SCRIPT_RANGES scripts in ``texts`` that no font has."""
+    covered = covered_code_points()
+    found = set()
+    for text in texts:
+        for char in str(text):
+            code_point = ord(char)
+            if code_point < 0x0600 or code_point in covered:
+                continue
+            if any(first <= code_point <= last for ranges in SCRIPT_RANGES.values() for first, last in ranges):
+                found.add(char)
+    return found
+
+
+def _new_pdf():
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    fonts = find_fonts()
+    if "latin" not in fonts:
+        return pdf, "helvetica"
+    for role, path in fonts.items():
+        pdf.add_font(role, fname=path)
+    pdf.set_fallback_fonts([role for role in fonts if role != "latin"])
+    try:
+        pdf.set_text_shaping(True)
+    except ImportError:
+        # uharfbuzz missing: glyphs still render, but joined scripts are not shaped.
+        pass
+    return pdf, "latin"
+
+
+def _layout(title, sections, generated_at):
+    pdf, family = _new_pdf()
+    if family != "helvetica":
+        missing_scripts()
+        texts = [title] + [heading for heading, _ in sections]
+        for _, content in sections:
+            texts += [content] if isinstance(content, str) else [value for row in content for value in row]
+        unrendered = _unrendered(texts)
+        if unrendered:
+            logger.warning("Report %r has characters no font can render: %s",
+                           title, " ".join(f"U+{ord(char):04X}" for char in sorted(unrendered)))
+
+    def clean(text):
+        text = str(text)
+        if family == "helvetica":
+            return text.encode("latin-1", "replace").decode("latin-1")
+        return text
+
+    pdf.add_page()
+    pdf.set_font(family, size=16)
+    pdf.multi_cell(0, 10, clean(title), new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font(family, size=9)
+    pdf.multi_cell(0, 6, f"Generated {generated_at}", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(4)
+
+    for heading, content in sections:
+        if heading:
+            pdf.set_font(family, size=13)
+            pdf.multi_cell(0, 8, clean(heading), new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font(family, size=11)
+        if isinstance(content, str):
+            for line in content.split("\n"):
+                pdf.multi_cell(0, 7, clean(line), new_x="LMARGIN", new_y="NEXT")
+        else:
+            # Only regular weights are registered, so shade the header row instead of bolding it.
+            with pdf.table(text_align="LEFT", headings_style=FontFace(fill_color=(230, 230, 230))) as table:
+                for row in content:
+                    cells = table.row()
+                    for value in row:
+                        cells.cell(clean(value))
+        pdf.ln(4)
+    return bytes(pdf.output())
+
+
+class _ReportCache:
+    """LRU of rendered PDFs, bounded by their total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+report_cache = _ReportCache(CACHE_BYTES)
+
+
+def report_key(title, sections, generated_at=None):
+    payload = json.dumps([title, sections, generated_at], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_report(title, sections, generated_at=None):
+    """Render a report to PDF bytes.
+
+    ``sections`` is a list of ``(heading, content)`` pairs. ``content`` is
+    either text (one paragraph per line) or a table given as a list of rows,
+    the first row being the header. ``generated_at`` is printed under the
+    title; it is part of the cache key, so pass a date rather than a
+    timestamp to let identical reports share one rendering.
+    """
+    generated_at = generated_at or datetime.now().strftime("%Y-%m-%d")
+    key = report_key(title, sections, generated_at)
+    data = report_cache.get(key)
+    if data is None:
+        data = _layout(title, sections, generated_at)
+        report_cache.set(key, data)
+    return data
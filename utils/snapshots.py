@@ -0,0 +1,101 @@
+"""Per-user columnar snapshots kept as memory-mapped Arrow files.
+
+A snapshot is a directory of Arrow IPC segments. Each segment holds a
+contiguous run of source rows ordered by id and is named after the first
+and last id it contains. New rows are written as a new segment; once there
+are more than MAX_SEGMENTS they are compacted into one. Loading memory-maps
+every segment, so columns are paged in by the OS on demand and shared
+through the page cache instead of being copied onto each session's heap.
+"""
+import hashlib
+import os
+import shutil
+import threading
+
+import pyarrow as pa
+
+ROOT = "data/snapshots"
+MAX_SEGMENTS = 8
+
+
+class SnapshotStore:
+    def __init__(self, name, schema, root=ROOT):
+        self.name = name
+        self.schema = schema
+        self.root = root
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def lock(self, key):
+        with self._registry_lock:
+            return self._locks.setdefault(key, threading.RLock())
+
+    def _dir(self, key):
+        # Hash the key so any username makes a safe directory name.
+        return os.path.join(self.root, self.name, hashlib.sha256(key.encode("utf-8")).hexdigest()[:24])
+
+    def segments(self, key):
+        """Return ``[(first_id, last_id, path), ...]`` in id order."""
+        directory = self._dir(key)
+        if not os.path.isdir(directory):
+            return []
+        found = []
+        for filename in os.listdir(directory):
+            if filename.endswith(".arrow"):
+                first, last = filename[:-len(".arrow")].split("-")
+                found.append((int(first), int(last), os.path.join(directory, filename)))
+        return sorted(found)
+
+    def load(self, key):
+        """Return ``(table, last_id)``; the table's buffers point into the mapped files."""
+        with self.lock(key):
+            segments = self.segments(key)
+            tables = [pa.ipc.open_file(pa.memory_map(path)).read_all() for _, _, path in segments]
+        if not tables:
+            return self.schema.empty_table(), 0
+        return pa.concat_tables(tables), segments[-1][1]
+
+    def append(self, key, batches, id_column="id"):
+        """Write ``batches`` (ordered by id) as a new segment; returns the rows written."""
+        with self.lock(key):
+            rows = self._write(key, batches, id_column)
+            if len(self.segments(key)) > MAX_SEGMENTS:
+                self.compact(key, id_column)
+            return rows
+
+    def _write(self, key, batches, id_column):
+        with self.lock(key):
+            directory = self._dir(key)
+            os.makedirs(directory, exist_ok=True)
+            partial = os.path.join(directory, f"segment.{os.getpid()}.tmp")
+            rows, first_id, last_id = 0, None, None
+            with pa.OSFile(partial, "wb") as sink, pa.ipc.new_file(sink, self.schema) as writer:
+                for batch in batches:
+                    if batch.num_rows == 0:
+                        continue
+                    ids = batch.column(id_column)
+                    if first_id is None:
+                        first_id = ids[0].as_py()
+                    last_id = ids[-1].as_py()
+                    rows += batch.num_rows
+                    writer.write_batch(batch)
+            if not rows:
+                os.remove(partial)
+                return 0
+            os.replace(partial, os.path.join(directory, f"{first_id:020d}-{last_id:020d}.arrow"))
+            return rows
+
+    def compact(self, key, id_column="id"):
+        with self.lock(key):
+            segments = self.segments(key)
+            if len(segments) < 2:
+                return
+            table, _ = self.load(key)
+            self._write(key, table.to_batches(), id_column)
+            # Readers that still map the old segments keep their pages until they let go.
+            for _, _, path in segments:
+                os.remove(path)
+
+    def clear(self, key):
+        with self.lock(key):
+            shutil.rmtree(self._dir(key), ignore_errors=True)
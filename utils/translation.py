@@ -0,0 +1,167 @@
+"""Cached, chunked machine translation.
+
+Texts are split into lines and sentences; each piece is looked up in a
+SQLite cache keyed on (backend, target language, hash of the piece), and
+the misses are translated concurrently on a bounded thread pool.
+
+The backend is pluggable: ``GoogleBackend`` calls Google Translate through
+deep_translator, ``OfflineBackend`` is a deterministic stand-in for tests
+and benchmarks. ``TRANSLATION_BACKEND=offline`` selects the stand-in.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import db_utils
+
+DB_PATH = "data/translations.db"
+TRANSLATE_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "4"))
+# deep_translator rejects requests longer than 5000 characters.
+MAX_CHUNK_CHARS = 4500
+MIN_CHUNK_CHARS = 200
+
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS translations
+    (key TEXT PRIMARY KEY,
+     target TEXT NOT NULL,
+     translation TEXT NOT NULL,
+     created_at REAL NOT NULL)
+    ''',
+]
+
+# Separators are kept (capturing group) so the text can be put back together
+# with its original line breaks and spacing.
+_SEPARATOR = re.compile(r"(\n+|(?<=[.!?۔।])\s+)")
+_PADDING = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+_WORDS = re.compile(r"\w")
+
+_pool = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate")
+
+
+class TranslationBackend:
+    name = None
+
+    def translate(self, text, target):
+        raise NotImplementedError()
+
+
+class GoogleBackend(TranslationBackend):
+    name = "google"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate(self, text, target):
+        from deep_translator import GoogleTranslator
+
+        # GoogleTranslator holds a requests session; keep one per worker thread.
+        translators = self._local.__dict__.setdefault("translators", {})
+        if target not in translators:
+            translators[target] = GoogleTranslator(source="auto", target=target)
+        return translators[target].translate(text)
+
+
+class OfflineBackend(TranslationBackend):
+    """Tags the text with the target language after a simulated round trip."""
+    name = "offline"
+
+    def __init__(self, latency=0.0, per_char=0.0):
+        self.latency = latency
+        self.per_char = per_char
+        self.calls = 0
+
+    def translate(self, text, target):
+        self.calls += 1
+        delay = self.latency + self.per_char * len(text)
+        if delay:
+            time.sleep(delay)
+        return f"[{target}] {text}"
+
+
+BACKENDS = {"google": GoogleBackend, "offline": OfflineBackend}
+
+
+def get_backend():
+    return BACKENDS[os.getenv("TRANSLATION_BACKEND", "google")]()
+
+
+def split_chunks(text, workers=TRANSLATE_WORKERS, max_chars=MAX_CHUNK_CHARS):
+    """Split ``text`` at line and sentence boundaries into about ``workers`` chunks.
+
+    ``"".join(split_chunks(text)) == text``. The chunk size never drops below
+    MIN_CHUNK_CHARS, so short answers stay a single request.
+    """
+    size = min(max(MIN_CHUNK_CHARS, -(-len(text) // workers)), max_chars)
+    parts = _SEPARATOR.split(text)
+    chunks, current = [], ""
+    for i in range(0, len(parts), 2):
+        sentence = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
+        if current and len(current) + len(sentence) > size:
+            chunks.append(current)
+            current = ""
+        while len(sentence) > max_chars:
+            # A single over-long sentence: fall back to fixed-size slices.
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        current += sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _key(backend, target, text):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{backend.name}:{target}:{digest}"
+
+
+class TranslationCache:
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        db_utils.migrate(self.db_path, MIGRATIONS)
+        placeholders = ",".join("?" * len(keys))
+        with db_utils.connection(self.db_path) as conn:
+            rows = conn.execute(
+                f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", list(keys)
+            ).fetchall()
+        return dict(rows)
+
+    def set_many(self, target, translations):
+        if not translations:
+            return
+        db_utils.migrate(self.db_path, MIGRATIONS)
+        now = time.time()
+        with db_utils.transaction(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, target, translation, created_at) VALUES (?, ?, ?, ?)",
+                [(key, target, translation, now) for key, translation in translations.items()],
+            )
+
+
+class CachedTranslator:
+    def __init__(self, backend=None, cache=None, pool=None):
+        self.backend = backend or get_backend()
+        self.cache = cache or TranslationCache()
+        self.pool = pool or _pool
+
+    def translate(self, text, target):
+        # The backend trims surrounding whitespace, so translate the stripped
+        # chunk and put its padding back afterwards.
+        padded = [_PADDING.match(chunk).groups() for chunk in split_chunks(text)]
+        pieces = {body for _, body, _ in padded if _WORDS.search(body)}
+        keys = {piece: _key(self.backend, target, piece) for piece in pieces}
+        cached = self.cache.get_many(list(keys.values()))
+
+        missing = [piece for piece in pieces if keys[piece] not in cached]
+        fresh = dict(zip(missing, self.pool.map(lambda piece: self.backend.translate(piece, target), missing)))
+        self.cache.set_many(target, {keys[piece]: fresh[piece] for piece in missing if fresh[piece]})
+
+        translated = {piece: cached.get(keys[piece]) or fresh.get(piece) or piece for piece in pieces}
+        return "".join(lead + translated.get(body, body) + trail for lead, body, trail in padded)
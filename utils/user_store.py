@@ -0,0 +1,80 @@
+import os
+from collections.abc import Mapping
+
+import yaml
+
+from utils import db_utils
+
+DB_PATH = "data/users.db"
+LEGACY_USERS_FILE = "users.yaml"
+
+
+def _import_legacy_users(conn):
+    # One-shot import of the accounts that used to live in users.yaml.
+    if not os.path.exists(LEGACY_USERS_FILE):
+        return
+    with open(LEGACY_USERS_FILE, "r") as f:
+        users = yaml.safe_load(f) or {}
+    accounts = users.get("credentials", {}).get("usernames", {}) or {}
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (username, name, password) VALUES (?, ?, ?)",
+        [(username, info.get("name", username), info["password"]) for username, info in accounts.items()],
+    )
+
+
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS users
+    (username TEXT PRIMARY KEY COLLATE NOCASE,
+     name TEXT NOT NULL,
+     password TEXT NOT NULL)
+    ''',
+    _import_legacy_users,
+]
+
+
+def init_db():
+    db_utils.migrate(DB_PATH, MIGRATIONS)
+
+
+def get_user(username):
+    with db_utils.connection(DB_PATH) as conn:
+        return conn.execute(
+            "SELECT username, name, password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+
+
+def add_user(username, name, password_hash):
+    """Insert a user; returns False if the username is already taken."""
+    with db_utils.transaction(DB_PATH) as conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO users (username, name, password) VALUES (?, ?, ?)",
+            (username, name, password_hash),
+        )
+    return cursor.rowcount == 1
+
+
+class UserCredentials(Mapping):
+    """Read-only ``credentials['usernames']`` view for streamlit_authenticator.
+
+    Users are looked up one at a time on demand instead of loading every
+    account into a dict on each rerun.
+    """
+
+    def __getitem__(self, username):
+        user = get_user(username)
+        if user is None:
+            raise KeyError(username)
+        return {"name": user[1], "password": user[2]}
+
+    def __contains__(self, username):
+        return get_user(username) is not None
+
+    def __iter__(self):
+        with db_utils.connection(DB_PATH) as conn:
+            usernames = [row[0] for row in conn.execute("SELECT username FROM users")]
+        return iter(usernames)
+
+    def __len__(self):
+        with db_utils.connection(DB_PATH) as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]